@@ -0,0 +1,35 @@
+"""Benchmark of fetching single boreholes from a large dataset: a
+boolean filter of each block per lookup against SGFData.borehole(),
+which groups the blocks once.
+
+    python benchmarks/bench_borehole.py [boreholes] [lookups]
+"""
+
+import sys
+import time
+import random
+
+import libsgfdata
+
+sys.path.insert(0, __file__.rsplit("/", 1)[0])
+from bench_geotech_set import make_sections
+
+def filter_borehole(sgf, id):
+    return {name: block[block[sgf.id_col] == id] for name, block in sgf.model_dict.items()}
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    sgf = libsgfdata.SGFData(make_sections(n))
+    ids = random.Random(0).sample(list(sgf.main.investigation_point), lookups)
+
+    t = time.perf_counter()
+    sgf.borehole(ids[0])
+    print("index build        %6d boreholes %8.3fs" % (n, time.perf_counter() - t))
+    for name, fn in [("filter            ", lambda id: filter_borehole(sgf, id)),
+                     ("SGFData.borehole()", sgf.borehole)]:
+        t = time.perf_counter()
+        for id in ids:
+            fn(id)
+        t = time.perf_counter() - t
+        print("%s %6d boreholes %8.3fs %8.2fus/lookup" % (name, n, t, t / lookups * 1e6))
@@ -0,0 +1,32 @@
+"""Benchmark of merging many per-file SGFData objects: appending them
+one at a time with SGFData(res, obj) (quadratic) against
+SGFDataBuilder, which concatenates each block once.
+
+    python benchmarks/bench_builder.py [objects] [max objects for the loop version]
+"""
+
+import sys
+import time
+
+import libsgfdata
+
+sys.path.insert(0, __file__.rsplit("/", 1)[0])
+from bench_geotech_set import make_sections
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    max_loop = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    objs = [libsgfdata.SGFData([section]) for section in make_sections(n)]
+
+    if n <= max_loop:
+        t = time.perf_counter()
+        res = objs[0]
+        for obj in objs[1:]:
+            res = libsgfdata.SGFData(res, obj)
+        t = time.perf_counter() - t
+        print("append loop    %6d objects %8.3fs" % (n, t))
+
+    t = time.perf_counter()
+    res = libsgfdata.SGFDataBuilder().extend(objs).finalize()
+    t = time.perf_counter() - t
+    print("SGFDataBuilder %6d objects %8.3fs" % (n, t))
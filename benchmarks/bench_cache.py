@@ -0,0 +1,30 @@
+"""Cold (parse and store) against warm (read from the cache) loads
+of SGFData(path, cache_dir=...), on the bundled example files.
+
+    python benchmarks/bench_cache.py [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import libsgfdata
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "data")
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    paths = [os.path.join(basepath, name) for name in sorted(os.listdir(basepath))]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        parse_cache = libsgfdata.ParseCache(cache_dir)
+        for name, clear in [("no cache", None), ("cold    ", True), ("warm    ", False)]:
+            t = 0
+            for repeat in range(repeats):
+                if clear:
+                    parse_cache.clear()
+                start = time.perf_counter()
+                for path in paths:
+                    libsgfdata.SGFData(path, cache_dir=parse_cache if clear is not None else None)
+                t += time.perf_counter() - start
+            print("%s %5d files %8.3fs %8.2fms/file" % (name, len(paths) * repeats, t, t / len(paths) / repeats * 1e3))
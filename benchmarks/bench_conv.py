@@ -0,0 +1,43 @@
+"""Microbenchmark of per-field value conversion: the generic
+parser._conv() against the precompiled per-block conversion plans,
+on all fields of the bundled example files.
+
+    python benchmarks/bench_conv.py
+"""
+
+import os
+import timeit
+
+from libsgfdata import metadata
+from libsgfdata import parser
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "data")
+
+def fields():
+    res = []
+    for name in sorted(os.listdir(basepath)):
+        block = None
+        with open(os.path.join(basepath, name), encoding="latin-1") as f:
+            for row in f:
+                row = row.rstrip()
+                if row in metadata.blocknames:
+                    block = metadata.blocknames[row]
+                elif row and block is not None:
+                    res.extend((block, k, v) for k, v in parser._split_fields(row))
+    return res
+
+def conv(fields):
+    for b, k, v in fields:
+        parser._conv(b, k, v)
+
+def plan(fields):
+    plans = parser._conversion_plans
+    untyped = parser._conv_untyped
+    for b, k, v in fields:
+        plans[b].get(k, untyped)(v)
+
+if __name__ == '__main__':
+    f = fields()
+    for fn in (conv, plan):
+        t = min(timeit.repeat(lambda: fn(f), number=1, repeat=3))
+        print("%-5s %8d fields %8.3fs %8.2fus/field" % (fn.__name__, len(f), t, t / len(f) * 1e6))
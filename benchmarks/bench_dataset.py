@@ -0,0 +1,37 @@
+"""Benchmark of bounding box queries against an on-disk SGFDataset:
+loading the whole dataset and filtering it in memory, against
+SGFDataset.within_bbox(), which reads only the shards of the matching
+boreholes.
+
+    python benchmarks/bench_dataset.py [boreholes] [shard_rows]
+"""
+
+import sys
+import tempfile
+import time
+
+import libsgfdata
+
+sys.path.insert(0, __file__.rsplit("/", 1)[0])
+from bench_geotech_set import make_sections
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    shard_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    sgf = libsgfdata.SGFData(make_sections(n))
+    with tempfile.TemporaryDirectory() as path:
+        t = time.perf_counter()
+        sgf.to_dataset(path, shard_rows=shard_rows)
+        print("write              %6d boreholes %8.3fs" % (n, time.perf_counter() - t))
+        bbox = (1000.0 + n // 2, 2000.0 + n // 2, 1000.0 + n // 2 + 100, 2000.0 + n // 2 + 100)
+
+        def load_all():
+            builder = libsgfdata.SGFDataBuilder()
+            builder.extend(libsgfdata.SGFDataset(path).iter_shards())
+            return builder.finalize().within_bbox(*bbox)
+
+        for name, fn in [("load all, filter   ", load_all),
+                         ("SGFDataset query   ", lambda: libsgfdata.SGFDataset(path).within_bbox(*bbox))]:
+            t = time.perf_counter()
+            res = fn()
+            print("%s %6d boreholes %8.3fs %6d selected" % (name, n, time.perf_counter() - t, len(res.main)))
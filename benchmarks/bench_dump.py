@@ -0,0 +1,35 @@
+"""Benchmark of writing SGF files: libsgfdata.dump() of the sections
+of an SGFData object, against SGFData.dump(), which writes the
+merged blocks directly, and the time to the first chunk of
+SGFData.iter_dump().
+
+    python benchmarks/bench_dump.py [boreholes] [rows]
+"""
+
+import io
+import sys
+import time
+
+import libsgfdata
+
+sys.path.insert(0, __file__.rsplit("/", 1)[0])
+from bench_geotech_set import make_sections
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sgf = libsgfdata.SGFData(make_sections(n, rows))
+    for name, fn in [("dump(sgf.sections)", lambda f: libsgfdata.dump(sgf.sections, f)),
+                     ("sgf.dump()        ", sgf.dump)]:
+        t = time.perf_counter()
+        f = io.BytesIO()
+        fn(f)
+        t = time.perf_counter() - t
+        print("%s %6d boreholes %8d bytes %8.3fs %8.2fMB/s" % (name, n, len(f.getvalue()), t, len(f.getvalue()) / t / 1e6))
+    t = time.perf_counter()
+    chunks = sgf.iter_dump()
+    first = next(chunks)
+    first_t = time.perf_counter() - t
+    size = len(first) + sum(len(chunk) for chunk in chunks)
+    t = time.perf_counter() - t
+    print("sgf.iter_dump()    %6d boreholes %8d bytes %8.3fs %8.2fMB/s, first chunk after %.3fs" % (n, size, t, size / t / 1e6, first_t))
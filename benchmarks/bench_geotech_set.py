@@ -0,0 +1,45 @@
+"""Benchmark of sections_to_geotech_set: one DataFrame per borehole
+and block, concatenated (as previously done), against collecting the
+rows of all boreholes and constructing each block once.
+
+    python benchmarks/bench_geotech_set.py [boreholes]
+"""
+
+import sys
+import timeit
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import libsgfdata
+
+def per_borehole_frames(sections, id_col="investigation_point"):
+    mains = []
+    datas = []
+    methods = []
+    for borehole in sections:
+        investigation_point = borehole["main"][0].get(id_col) or str(uuid.uuid4())
+        mains.append(pd.DataFrame(borehole["main"]).assign(**{id_col: investigation_point}))
+        datas.append(pd.DataFrame(borehole["data"]).assign(**{id_col: investigation_point}))
+        methods.append(pd.DataFrame(borehole["method"]).assign(**{id_col: investigation_point}))
+    return {"main": pd.concat(mains, ignore_index=True),
+            "data": pd.concat(datas, ignore_index=True),
+            "method": pd.concat(methods, ignore_index=True)}
+
+def make_sections(n, rows=50):
+    depth = np.arange(rows) * 0.02
+    return [{"main": [{"method_code": 7, "investigation_point": str(idx),
+                       "x_coordinate": 1000.0 + idx, "y_coordinate": 2000.0 + idx}],
+             "data": pd.DataFrame({"depth": depth, "feed_thrust_force": depth * 3,
+                                   "penetration_rate": np.full(rows, 13)}),
+             "method": [{"method_code": 7}]}
+            for idx in range(n)]
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sections = make_sections(n)
+    for name, fn in [("per-borehole frames", lambda: per_borehole_frames(sections)),
+                     ("single pass        ", lambda: libsgfdata.sections_to_geotech_set(sections))]:
+        t = min(timeit.repeat(fn, number=1, repeat=3))
+        print("%s %6d boreholes %8.3fs %8.2fus/borehole" % (name, n, t, t / n * 1e6))
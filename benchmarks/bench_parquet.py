@@ -0,0 +1,28 @@
+"""Benchmark of reading an archive back: reparsing an SGF file against
+reading the same boreholes converted with SGFData.to_parquet().
+
+    python benchmarks/bench_parquet.py [boreholes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import libsgfdata
+
+sys.path.insert(0, __file__.rsplit("/", 1)[0])
+from bench_geotech_set import make_sections
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as path:
+        sgf = libsgfdata.SGFData(make_sections(n))
+        sgf.dump(os.path.join(path, "archive.sgf"))
+        libsgfdata.SGFData(os.path.join(path, "archive.sgf")).to_parquet(os.path.join(path, "archive"))
+        for name, fn in [("SGFData(sgf)         ", lambda: libsgfdata.SGFData(os.path.join(path, "archive.sgf"))),
+                         ("SGFData.from_parquet ", lambda: libsgfdata.SGFData.from_parquet(os.path.join(path, "archive")))]:
+            t = time.perf_counter()
+            res = fn()
+            t = time.perf_counter() - t
+            print("%s %6d boreholes %6d rows %8.3fs" % (name, len(res.main), len(res.data), t))
@@ -0,0 +1,41 @@
+"""Throughput of parse_many() for different numbers of workers, on
+the bundled example files replicated many times, with the borehole
+ids (HK) of each copy prefixed by the copy number so that they do not
+collide.
+
+    python benchmarks/bench_parse_many.py [copies]
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+
+import libsgfdata
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "data")
+
+if __name__ == '__main__':
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for copy in range(copies):
+            for name in os.listdir(basepath):
+                path = os.path.join(tmpdir, "%s-%s" % (copy, name))
+                with open(os.path.join(basepath, name), "rb") as f:
+                    content = re.sub(rb"(^|[,\n])HK=", rb"\1HK=%d-" % copy, f.read())
+                with open(path, "wb") as f:
+                    f.write(content)
+                paths.append(path)
+
+        workers = 1
+        baseline = None
+        while workers <= (os.cpu_count() or 1):
+            t = time.time()
+            res = libsgfdata.parse_many(paths, workers=workers)
+            t = time.time() - t
+            baseline = baseline or t
+            print("%3d workers %6d files %8.2fs %8.1f files/s speedup %.2f" % (
+                workers, len(paths), t, len(paths) / t, baseline / t))
+            workers *= 2
@@ -0,0 +1,35 @@
+"""Benchmark of the main/method rename passes of the parser and
+dumper: pandas .loc lookups per key (as previously done) against the
+precomputed dict translation tables in metadata.
+
+    python benchmarks/bench_rename.py [rows]
+"""
+
+import sys
+import timeit
+
+from libsgfdata import metadata
+
+def loc_rename(rows, tbl, col):
+    return [{tbl.loc[key, col] if key in tbl.index else key: value
+             for key, value in row.items()}
+            for row in rows]
+
+def dict_rename(rows, table):
+    return [{table.get(key, key): value
+             for key, value in row.items()}
+            for row in rows]
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    main_rows = [{"HA": 1, "HB": 1, "HC": "GTB-PC", "HD": "20120105", "HI": "1130", "HM": 7,
+                  "HJ": "fv 450", "HK": str(idx), "HO": 15.0, "HN": 50652, "XX": "unknown"}
+                 for idx in range(n)]
+    ident_rows = dict_rename(main_rows, metadata.main_idents)
+
+    for name, fn in [("parse  loc ", lambda: loc_rename(main_rows, metadata.main, "ident")),
+                     ("parse  dict", lambda: dict_rename(main_rows, metadata.main_idents)),
+                     ("dump   loc ", lambda: loc_rename(ident_rows, metadata.unmain, "code")),
+                     ("dump   dict", lambda: dict_rename(ident_rows, metadata.main_codes))]:
+        t = min(timeit.repeat(fn, number=1, repeat=3))
+        print("%s %6d rows %8.3fs %8.2fus/row" % (name, n, t, t / n * 1e6))
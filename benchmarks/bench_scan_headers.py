@@ -0,0 +1,26 @@
+"""Cataloguing speed: a full parse() of each file against
+scan_headers(), which only parses the main and method blocks, on the
+bundled example files replicated many times.
+
+    python benchmarks/bench_scan_headers.py [copies]
+"""
+
+import os
+import sys
+import time
+
+import libsgfdata
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "data")
+
+if __name__ == '__main__':
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    paths = [os.path.join(basepath, name) for name in sorted(os.listdir(basepath))] * copies
+    for name, fn in [("parse(), text engine", lambda path: libsgfdata.parse(path)),
+                     ("parse(), mmap engine", lambda path: libsgfdata.parse(path, engine="mmap")),
+                     ("scan_headers()      ", libsgfdata.scan_headers)]:
+        t = time.perf_counter()
+        for path in paths:
+            fn(path)
+        t = time.perf_counter() - t
+        print("%s %5d files %8.3fs %8.2fms/file" % (name, len(paths), t, t / len(paths) * 1e3))
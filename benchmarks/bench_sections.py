@@ -0,0 +1,38 @@
+"""Scaling benchmark of geotech_set_to_sections (and so of
+SGFData.sections and SGFData.dump): a boolean filter and iterrows()
+per borehole (as previously done) against grouping each block once
+by id_col and slicing.
+
+    python benchmarks/bench_sections.py [boreholes,...] [max boreholes for the filter version]
+
+The filter version is quadratic in the number of boreholes, so by
+default it is only run up to 2000 boreholes.
+"""
+
+import sys
+import timeit
+
+import libsgfdata
+
+sys.path.insert(0, __file__.rsplit("/", 1)[0])
+from bench_geotech_set import make_sections
+
+def filter_per_borehole(geotech, id_col="investigation_point"):
+    return [{"main": [row.to_dict() for idx, row
+                      in geotech["main"][geotech["main"][id_col] == section_id].iterrows()],
+             "data": geotech["data"][geotech["data"][id_col] == section_id],
+             "method": [method_row for method_idx, method_row
+                        in geotech["method"][geotech["method"][id_col] == section_id].iterrows()]
+            } for section_id in geotech["main"][id_col].unique()]
+
+if __name__ == '__main__':
+    sizes = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [100, 1000, 10000]
+    max_filter = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    for n in sizes:
+        geotech = libsgfdata.sections_to_geotech_set(make_sections(n))
+        fns = [("grouped offsets", lambda: libsgfdata.geotech_set_to_sections(geotech))]
+        if n <= max_filter:
+            fns.insert(0, ("filter         ", lambda: filter_per_borehole(geotech)))
+        for name, fn in fns:
+            t = min(timeit.repeat(fn, number=1, repeat=3))
+            print("%s %6d boreholes %8.3fs %8.2fus/borehole" % (name, n, t, t / n * 1e6))
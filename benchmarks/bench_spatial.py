@@ -0,0 +1,39 @@
+"""Benchmark of spatial queries over borehole positions: filtering
+the coordinate arrays (linear in the number of boreholes) against the
+KD-tree in libsgfdata.spatial.
+
+    python benchmarks/bench_spatial.py [boreholes] [queries]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from libsgfdata import spatial
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rnd = np.random.default_rng(0)
+    x = rnd.uniform(0, 100000, n)
+    y = rnd.uniform(0, 100000, n)
+    qx = rnd.uniform(0, 100000, queries)
+    qy = rnd.uniform(0, 100000, queries)
+
+    t = time.perf_counter()
+    tree = spatial.KDTree(x, y)
+    print("build                %7d boreholes %8.3fs" % (n, time.perf_counter() - t))
+
+    for name, fn in [
+            ("bbox   filter       ", lambda px, py: np.flatnonzero((x >= px) & (x <= px + 500) & (y >= py) & (y <= py + 500))),
+            ("bbox   KD-tree      ", lambda px, py: tree.within_bbox(px, py, px + 500, py + 500)),
+            ("radius filter       ", lambda px, py: np.flatnonzero(np.hypot(x - px, y - py) <= 500)),
+            ("radius KD-tree      ", lambda px, py: tree.within_radius(px, py, 500)),
+            ("nearest argpartition", lambda px, py: np.argpartition(np.hypot(x - px, y - py), 10)[:10]),
+            ("nearest KD-tree     ", lambda px, py: tree.nearest(px, py, 10))]:
+        t = time.perf_counter()
+        for px, py in zip(qx, qy):
+            fn(px, py)
+        t = time.perf_counter() - t
+        print("%s %7d boreholes %8.3fs %8.2fus/query" % (name, n, t, t / queries * 1e6))
@@ -1,13 +1,23 @@
 from .metadata import main, method, data, methods, comments
-from .parser import parse
-from .dumper import dump
+from .parser import parse, iter_sections, scan_headers, load_data, EncodingDetector
+from .cache import ParseCache
+from .dumper import dump, iter_dump, dumps
 from .normalizer import normalize
 from .validate import validate
+from . import metadata as _metadata
+from . import dtypes
+from . import index
+from . import spatial
+from . import cache as _cache
+from . import dumper as _dumper
 import pandas as pd
 import numpy as np
 import logging
 import copy
 import uuid
+import os
+import pickle
+import concurrent.futures
 
 logger = logging.getLogger(__name__)
 
@@ -17,37 +27,96 @@ def merge_dicts(*dicts):
         res.update(d)
     return res
 
+def _block_key(block):
+    # Under copy-on-write (pandas 3), a block modified in place while a
+    # shallow copy of it exists gets new arrays, see SGFData._cached()
+    return (id(block), id(block.index), tuple(block.columns), tuple(map(id, block._mgr.arrays)))
+
+def _concat(frames, **kw):
+    """Like pd.concat(), but keeps categorical columns categorical
+    even if their categories differ between the frames, by setting
+    them to the union of the categories first."""
+    frames = list(frames)
+    categories = {}
+    for frame in frames:
+        for col, dtype in frame.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories.setdefault(col, {}).update(dict.fromkeys(dtype.categories))
+    dtypes = {col: pd.CategoricalDtype(list(values)) for col, values in categories.items()}
+    def set_categories(frame):
+        cols = {col: frame[col].cat.set_categories(dtypes[col].categories)
+                for col, dtype in frame.dtypes.items()
+                if col in dtypes and isinstance(dtype, pd.CategoricalDtype) and dtype != dtypes[col]}
+        return frame.assign(**cols) if cols else frame
+    if dtypes:
+        frames = [set_categories(frame) for frame in frames]
+    return pd.concat(frames, **kw)
+
+# Categorical columns of the main block, and the categories they
+# always have
+_main_categories = {"method_code": _metadata.methods_categories,
+                    "stop_code": _metadata.comments_categories}
+
 def sections_to_geotech_set(sections, merge=False, id_col="investigation_point"):
+    """Converts a list, or any other iterable, of sections to a dict of
+    main, data and method DataFrames. Sections are consumed one at a
+    time; main and method rows are collected in flat lists, and each
+    block is constructed only once."""
+    ids = []
     mains = []
     datas = []
+    data_lengths = []
+    data_id_loc = None
     methods = []
+    method_lengths = []
     for borehole in sections:
-        for key in ['main','data','method']:
-            if key not in borehole:
-                borehole[key]=[]
-        
-        if not len(borehole["main"]): borehole["main"].append({})
-        if id_col in borehole["main"][0]:
-            investigation_point = borehole["main"][0][id_col]
-            print("Parsing: ", investigation_point)
+        main = borehole.get("main") or [{}]
+        if id_col in main[0]:
+            investigation_point = main[0][id_col]
         else:
             investigation_point = str(uuid.uuid4())
-    
-        if merge:
-            main = pd.DataFrame([merge_dicts(*borehole["main"])])
-        else:
-            main = pd.DataFrame(borehole["main"])
-
-        mains.append(main.assign(**{id_col: investigation_point}))
-        datas.append(pd.DataFrame(borehole["data"]).assign(**{id_col: investigation_point}))
-        methods.append(pd.DataFrame(borehole["method"]).assign(**{id_col: investigation_point}))
+        ids.append(investigation_point)
 
-    mains = pd.concat(mains, ignore_index=True)
-    datas = pd.concat(datas, ignore_index=True)
-    methods = pd.concat(methods, ignore_index=True)
+        if merge:
+            main = [merge_dicts(*main)]
+        for row in main:
+            row = dict(row)
+            row[id_col] = investigation_point
+            mains.append(row)
+
+        data = borehole.get("data")
+        if data is not None and len(data):
+            if not isinstance(data, pd.DataFrame):
+                data = pd.DataFrame(data)
+            datas.append(data)
+        data_lengths.append(len(data) if data is not None else 0)
+        if data_id_loc is None:
+            # Keep the id column where adding it to each borehole
+            # and concatenating would have put it
+            columns = list(data.columns) if data_lengths[-1] else []
+            data_id_loc = columns.index(id_col) if id_col in columns else len(columns)
+
+        method = borehole.get("method") or []
+        methods.extend(dict(row) for row in method)
+        method_lengths.append(len(method))
+
+    ids = pd.Series(ids)
+    mains = pd.DataFrame(mains)
+    if datas:
+        datas = _concat(datas, ignore_index=True)
+        if id_col in datas.columns:
+            del datas[id_col]
+    else:
+        datas = pd.DataFrame(index=pd.RangeIndex(0))
+    datas.insert(data_id_loc or 0, id_col, ids.repeat(data_lengths).reset_index(drop=True))
+    methods = pd.DataFrame(methods, index=pd.RangeIndex(len(methods)))
+    methods[id_col] = ids.repeat(method_lengths).reset_index(drop=True)
+
+    for col, categories in _main_categories.items():
+        if col in mains.columns:
+            mains[col] = _metadata.categorical(mains[col], categories)
     
-    unique_ids = set(mains[id_col])
-    assert len(unique_ids) == len(sections), "%s is not unique for each borehole" % id_col
+    assert ids.is_unique, "%s is not unique for each borehole" % id_col
         
     return {"main": mains, "data": datas, "method": methods}
 
@@ -62,17 +131,107 @@ def _infer_projection_from_dataframe(dictionary, column='projection'):
     return int(projections[0])
 
 def geotech_set_to_sections(geotech, id_col="investigation_point"):
-    return [{"main": [row.to_dict() for idx, row
-                      in geotech["main"][geotech["main"][id_col] == section_id].iterrows()]
-                     if "main" in geotech else [],
-             "data": geotech["data"][geotech["data"][id_col] == section_id]
+    """Splits a dict of main, data and method DataFrames into a list
+    of sections, one per borehole in main. Each block is grouped by
+    id_col once, so each section's data is a slice of the data
+    block."""
+    def group(block):
+        frame = geotech[block]
+        groups = index.GroupIndex(frame[id_col])
+        return groups, groups.sort(frame)
+
+    main_groups, main = group("main")
+    main = main.to_dict("records")
+    if "data" in geotech:
+        data_groups, data = group("data")
+    if "method" in geotech:
+        method_groups, method = group("method")
+        method = method.to_dict("records")
+    return [{"main": main[main_groups.slice(section_id)],
+             "data": data.iloc[data_groups.slice(section_id)]
                      if "data" in geotech else pd.DataFrame(),
-             "method": [method_row for method_idx, method_row
-                        in geotech["method"][geotech["method"][id_col] == section_id].iterrows()]
+             "method": method[method_groups.slice(section_id)]
                      if "method" in geotech else pd.DataFrame()
-            } for section_id in geotech["main"][id_col].unique()]
+            } for section_id in main_groups.keys]
+
+def _concat_model_dicts(model_dicts):
+    res = {}
+    for block in ("main", "data", "method"):
+        blockdata = [
+            model_dict[block]
+            for model_dict in model_dicts
+            if block in model_dict]
+        if blockdata:
+            res[block] = _concat(blockdata, ignore_index=True)
+    return res
+
+def _parse_files(paths, kw):
+    encoding = kw.get("encoding")
+    res = []
+    for path in paths:
+        try:
+            res.append((path, SGFData(path, **kw).model_dict, None))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = Exception(repr(e))
+            res.append((path, None, e))
+    return res, encoding.stats if isinstance(encoding, EncodingDetector) else None
+
+def parse_many(paths, workers=None, **kw):
+    """Parses many files in parallel using a pool of worker processes
+    and merges them into a single SGFData object, concatenating each
+    block only once.
+
+    workers defaults to the number of CPUs; with workers=1 files are
+    parsed in the current process. Any remaining keyword arguments
+    are passed on to SGFData() for each file. Without an encoding,
+    the files share one EncodingDetector, see libsgfdata.parser.
+
+    A file that fails to parse does not abort the run; instead, the
+    exception is stored in the parse_errors dictionary of the returned
+    object, keyed by path. So is the ValueError of a file with a
+    borehole id that an earlier file already had, see SGFDataBuilder;
+    the boreholes of such a file are left out.
+
+    A dtype_policy is applied once, to the merged data block.
+    """
+    paths = list(paths)
+    dtype_policy = kw.pop("dtype_policy", None)
+    if kw.get("encoding") is None:
+        kw["encoding"] = EncodingDetector()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+    chunksize = max(1, -(-len(paths) // (workers * 4)))
+    chunks = [paths[idx:idx+chunksize] for idx in range(0, len(paths), chunksize)]
+    if workers == 1:
+        results = [_parse_files(chunk, kw) for chunk in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_parse_files, chunks, [kw] * len(chunks)))
+        encoding = kw.get("encoding")
+        if isinstance(encoding, EncodingDetector):
+            for chunk, stats in results:
+                encoding.stats.update(stats)
+    results = [result for chunk, stats in results for result in chunk]
+
+    builder = SGFDataBuilder(id_col=kw.get("id_col", "investigation_point"))
+    for path, model_dict, error in results:
+        if model_dict is not None:
+            try:
+                builder.append(model_dict)
+            except ValueError as e:
+                error = e
+        if error is not None:
+            builder.parse_errors[path] = error
+    res = SGFData(_concat_model_dicts(builder.model_dicts), id_col=builder.id_col, dtype_policy=dtype_policy)
+    res.parse_errors = builder.parse_errors
+    for path, error in res.parse_errors.items():
+        logger.warning("Unable to parse %s: %s" % (path, error))
+    return res
 
-_dump_function = dump
 _normalize_function = normalize
 _validate_function = validate
 
@@ -80,10 +239,17 @@ class SGFData(object):
     def __new__(cls, *arg, **kw):
         normalize = kw.pop("normalize", False)
         encoding = kw.pop("encoding", None)
+        engine = kw.pop("engine", "text")
+        blocks = kw.pop("blocks", None)
+        cache_dir = kw.pop("cache_dir", None)
         validate = kw.pop("validate", False)
+        dtype_policy = kw.pop("dtype_policy", None)
         self = object.__new__(cls)
         self._model_dict = {}
+        self._cache = {}
         self.id_col = "investigation_point"
+        self.parse_errors = {}
+        self.dtype_report = None
         if arg or kw:
             self.id_col = kw.pop("id_col", "investigation_point")
             if arg and isinstance(arg[0], dict):
@@ -91,28 +257,84 @@ class SGFData(object):
             elif arg and isinstance(arg[0], list):
                 self._model_dict = sections_to_geotech_set(arg[0], id_col=self.id_col)
             elif arg and isinstance(arg[0], SGFData):
-                for block in ("main", "data", "method"):
-                    blockdata = [
-                        argi._model_dict[block]
-                        for argi in arg
-                        if block in argi._model_dict]
-                    if blockdata:
-                        self._model_dict[block] = pd.concat(blockdata).reset_index(drop=True)
+                self._model_dict = _concat_model_dicts([argi._model_dict for argi in arg])
             else:
-                self._model_dict = sections_to_geotech_set(parse(*arg, encoding=encoding), id_col=self.id_col)
+                def parse():
+                    return sections_to_geotech_set(iter_sections(*arg, encoding=encoding, engine=engine, blocks=blocks), id_col=self.id_col)
+                if cache_dir is not None and isinstance(arg[0], str):
+                    parse_cache = cache_dir if isinstance(cache_dir, _cache.ParseCache) else _cache.ParseCache(cache_dir)
+                    self._model_dict = parse_cache.load(
+                        arg[0], parse, encoding=encoding if isinstance(encoding, str) else None,
+                        blocks=blocks, id_col=self.id_col)
+                else:
+                    self._model_dict = parse()
+        if dtype_policy is not None:
+            self.compact_dtypes(dtype_policy)
         if normalize:
-            self = self.normalize(**kw)
+            self.normalize(inplace=True, **kw)
         if validate:
             self.validate(**kw)
         return self
 
+    @classmethod
+    def from_sections(cls, sections, id_col="investigation_point", **kw):
+        """Creates an SGFData object from an iterable of sections,
+        e.g. the generator returned by iter_sections(), consuming it
+        one section at a time."""
+        return cls(sections_to_geotech_set(sections, id_col=id_col), id_col=id_col, **kw)
+
+    @classmethod
+    def from_files(cls, paths, workers=None, **kw):
+        """Parses many files in parallel, see parse_many()."""
+        return parse_many(paths, workers=workers, **kw)
+
+    @classmethod
+    def from_parquet(cls, path, ids=None, **kw):
+        """Reads a directory written by to_parquet(), optionally only
+        the boreholes with the given ids. Requires pyarrow."""
+        from . import parquet
+        model_dict, id_col = parquet.read(path, ids=ids)
+        return cls(model_dict, id_col=id_col, **kw)
+
     def dump(self, *arg, **kw):
-        _dump_function(self.sections, *arg, **kw)
+        _dumper.dump_model_dict(self.model_dict, *arg, id_col=self.id_col, **kw)
+
+    def iter_dump(self, **kw):
+        """Yields this object in SGF format as encoded byte chunks,
+        see libsgfdata.dumper.iter_dump_model_dict()."""
+        return _dumper.iter_dump_model_dict(self.model_dict, id_col=self.id_col, **kw)
+
+    def dumps(self, **kw):
+        """Returns this object in SGF format as bytes."""
+        return b"".join(self.iter_dump(**kw))
+
+    def to_parquet(self, path, row_group_size=65536):
+        """Writes this object to the directory path, as one parquet
+        file per block, with row groups of whole boreholes of about
+        row_group_size rows. Requires pyarrow."""
+        from . import parquet
+        parquet.write(self.model_dict, path, id_col=self.id_col, row_group_size=row_group_size)
+
+    def copy(self, deep=True):
+        """Returns a copy of this object. With deep=False, the blocks
+        are shallow copies: columns are shared with this object until
+        either side replaces them."""
+        res = copy.copy(self)
+        res._model_dict = {name: block.copy(deep=deep) for name, block in self._model_dict.items()}
+        res._cache = {}
+        res.parse_errors = dict(self.parse_errors)
+        return res
 
-    def normalize(self, **kw):
+    def normalize(self, inplace=False, **kw):
         """Normalizes column names, column dtypes, stop code names,
         depth columns and coordinates.
 
+        By default a normalized copy is returned. Since the normalizer
+        replaces whole columns rather than modifying them, this is a
+        shallow copy, and only the columns that are changed take up
+        additional memory. With inplace=True this object is modified
+        instead, and None is returned.
+
 
         Column names:
         Normalized according to the "normalization" column of the
@@ -151,9 +373,19 @@ class SGFData(object):
         "x_web","y_web".
 
         """
-        res = copy.deepcopy(self)
+        res = self if inplace else self.copy(deep=False)
         _normalize_function(res, **kw)
-        return res
+        res.invalidate()
+        return None if inplace else res
+
+    def compact_dtypes(self, dtype_policy="compact"):
+        """Converts the data block according to a dtype policy, see
+        libsgfdata.dtypes. A report of the bytes saved per column is
+        stored in self.dtype_report."""
+        data, self.dtype_report = dtypes.apply_policy(self.data, dtype_policy, id_col=self.id_col)
+        if data is not None:
+            self.data = data
+        return self
 
     def validate(self, **kw):
         _validate_function(self)
@@ -162,14 +394,148 @@ class SGFData(object):
     def model_dict(self):
         return self._model_dict
 
+    def _cache_key(self, blocks=("main", "data", "method")):
+        return (self.id_col,) + tuple(
+            _block_key(self.model_dict[name]) if self.model_dict.get(name) is not None else None
+            for name in blocks)
+
+    def _cached(self, name, fn, blocks=("main", "data", "method")):
+        """Returns fn(), memoized until the given blocks change."""
+        key = self._cache_key(blocks)
+        if name not in self._cache or self._cache[name][0] != key:
+            # The blocks and their arrays are kept referenced so that
+            # their ids in key can not be reused. The shallow copies
+            # also make pandas copy-on-write copy, rather than modify,
+            # the arrays of a block modified in place, which changes
+            # its key. This costs a copy of each column modified in
+            # place afterwards, so only the blocks that fn depends on
+            # are held.
+            blocks = tuple(self.model_dict.get(name) for name in blocks)
+            self._cache[name] = (key, fn(), blocks,
+                                 tuple(block.copy(deep=False) if block is not None else None for block in blocks))
+        return self._cache[name][1]
+
+    def invalidate(self):
+        """Drops cached values derived from the blocks, e.g. the
+        sections. Changes to main, data or method, including changes
+        of values in place, are detected automatically, as pandas
+        copy-on-write gives a modified block new arrays while a cached
+        value refers to it, so this is only needed to free memory."""
+        self._cache = {}
+
+    def get_sections(self, view=False):
+        """Returns the data as a list of sections, that can be
+        modified freely. The sections are built once and cached until
+        the blocks change, and a copy is returned. With view=True the
+        cached list itself is returned, without copying; it is shared
+        by all callers and must not be modified."""
+        sections = self._cached("sections", lambda: geotech_set_to_sections(self.model_dict, id_col=self.id_col))
+        if view:
+            return sections
+        # Under copy-on-write, shallow copies of the DataFrames are
+        # enough to keep changes to them out of the cached sections
+        return [{"main": [dict(row) for row in section["main"]],
+                 "data": section["data"].copy(deep=False),
+                 "method": [dict(row) for row in section["method"]]
+                           if isinstance(section["method"], list) else section["method"].copy(deep=False)}
+                for section in sections]
+
     @property
     def sections(self):
-        return geotech_set_to_sections(self.model_dict, id_col=self.id_col)
+        """A copy of the sections, see get_sections()."""
+        return self.get_sections()
     
     @sections.setter
     def sections(self, sections):
         self._model_dict = sections_to_geotech_set(sections, id_col=self.id_col)
+        self.invalidate()
             
+    def _borehole_index(self):
+        def build():
+            res = {}
+            for name, block in self.model_dict.items():
+                if block is not None and self.id_col in block.columns:
+                    groups = index.GroupIndex(block[self.id_col])
+                    res[name] = (groups, groups.sort(block))
+            return res
+        return self._cached("borehole_index", build)
+
+    def boreholes(self, ids):
+        """Returns a new SGFData object with the boreholes with the
+        given ids, in that order. Each block is grouped by id_col once,
+        when first needed and again after the blocks have changed;
+        after that a lookup does not depend on the size of the
+        dataset. Rows keep their order within each
+        borehole."""
+        ids = list(ids)
+        borehole_index = self._borehole_index()
+        if "main" in borehole_index:
+            missing = [id for id in ids if id not in borehole_index["main"][0]]
+            if missing:
+                raise KeyError(missing[0] if len(missing) == 1 else missing)
+        model_dict = {}
+        for name, (groups, block) in borehole_index.items():
+            if len(ids) == 1:
+                model_dict[name] = block.iloc[groups.slice(ids[0])]
+            else:
+                model_dict[name] = block.iloc[groups.rows(ids)]
+        return SGFData(model_dict, id_col=self.id_col)
+
+    def borehole(self, id):
+        """Returns a new SGFData object with a single borehole, see
+        boreholes()."""
+        return self.boreholes([id])
+
+    def iter_boreholes(self):
+        """Yields (id, SGFData) for each borehole in main."""
+        borehole_index = self._borehole_index()
+        if "main" not in borehole_index:
+            return
+        for id in borehole_index["main"][0].keys:
+            yield id, self.borehole(id)
+
+    def _spatial_index(self):
+        return self._cached("spatial_index", lambda: spatial.KDTree(
+            self.main.x_coordinate, self.main.y_coordinate), blocks=("main",))
+
+    def _boreholes_at(self, positions):
+        ids = self.main[self.id_col].iloc[positions].tolist()
+        return self.boreholes(dict.fromkeys(ids))
+
+    def within_bbox(self, xmin, ymin, xmax, ymax):
+        """Returns a new SGFData object with the boreholes inside
+        the bounding box. Coordinates are in the projection of main.
+        Spatial queries use a KD-tree over the borehole positions,
+        built when first needed."""
+        return self._boreholes_at(self._spatial_index().within_bbox(xmin, ymin, xmax, ymax))
+
+    def within_radius(self, x, y, radius):
+        """Returns a new SGFData object with the boreholes within
+        radius of (x, y)."""
+        return self._boreholes_at(self._spatial_index().within_radius(x, y, radius))
+
+    def nearest(self, x, y, k=1):
+        """Returns a new SGFData object with the k boreholes nearest
+        to (x, y), nearest first."""
+        distances, positions = self._spatial_index().nearest(x, y, k)
+        return self._boreholes_at(positions)
+
+    def to_dataset(self, path, shard_rows=1000000):
+        """Writes this object as an on-disk dataset, see
+        libsgfdata.dataset.SGFDataset, with boreholes grouped into
+        shards of about shard_rows data rows."""
+        writer = SGFDatasetWriter(path, shard_rows=shard_rows, id_col=self.id_col)
+        borehole_index = self._borehole_index()
+        ids = borehole_index["main"][0].keys
+        shard = np.zeros(len(ids), dtype=int)
+        if "data" in borehole_index:
+            counts = borehole_index["data"][0].counts(ids)
+            shard = (np.cumsum(counts) - counts) // shard_rows
+        for chunk in np.split(np.arange(len(ids)), np.flatnonzero(np.diff(shard)) + 1):
+            if len(chunk):
+                writer.append(self.boreholes([ids[idx] for idx in chunk]), flush=True)
+        writer.close()
+
     @property
     def main(self):
         return self.model_dict.get("main", None)
@@ -177,6 +543,7 @@ class SGFData(object):
     @main.setter
     def main(self, a):
         self.model_dict["main"] = a
+        self.invalidate()
     
     @property
     def data(self):
@@ -185,6 +552,7 @@ class SGFData(object):
     @data.setter
     def data(self, a):
         self.model_dict["data"] = a
+        self.invalidate()
 
     @property
     def method(self):
@@ -193,6 +561,7 @@ class SGFData(object):
     @method.setter
     def method(self, a):
         self.model_dict["method"] = a
+        self.invalidate()
         
     def __repr__(self):
         res = [
@@ -212,7 +581,9 @@ class SGFData(object):
 
     def sample_dtm(self, raster, overwrite=True):
         from . import dtm
-        self.sections = dtm.sample_z_coordinate_from_dtm(self.sections, self.projection, raster=raster, overwrite=overwrite)
+        sections = self.get_sections()
+        dtm.sample_z_coordinate_from_dtm(sections, self.projection, raster=raster, overwrite=overwrite)
+        self.sections = sections
 
     def sample_terrainy_dtm(self, raster_name, overwrite=True):
         import terrainy
@@ -241,34 +612,120 @@ class SGFData(object):
                 positions.loc[filt, "topo"] = [v[0] for v in dataset.sample(xy[filt,:])]
                 
         self.main["z_coordinate"] = positions.topo
+        self.invalidate()
         
     @property
     def projection(self):
-        return _infer_projection_from_dataframe(self._model_dict)
-    
-    @property
-    def positions(self):
-        import geopandas as gpd
+        if self.main is None:
+            return None
+        return self._projection()
 
+    def _projection(self):
+        return self._cached("projection", lambda: _infer_projection_from_dataframe(self._model_dict), blocks=("main",))
+
+    def _checked_projection(self):
         assert self.main is not None, 'self.main DataFrame is None, so cannot access geographic attributes like positions, area, or bounds'
         assert len(self.main)>0,'self.main DataFrame is either missing or is empty'
         
-        projection = self.projection
+        projection = self._projection()
         if projection is None: raise ValueError("SGF file has boreholes in multiple projections, or projection not specified.")
-        
-        positions = gpd.GeoDataFrame(
-            geometry=gpd.points_from_xy(self.main.x_coordinate, self.main.y_coordinate),
-            index=self.main.index)
-        return positions.set_crs(projection)
+        return projection
+
+    # positions, area and bounds are cached until the blocks change;
+    # copies are returned so that callers can modify them.
+    
+    @property
+    def positions(self):
+        import geopandas as gpd
+
+        projection = self._checked_projection()
+        def positions():
+            return gpd.GeoDataFrame(
+                geometry=gpd.points_from_xy(self.main.x_coordinate, self.main.y_coordinate),
+                index=self.main.index).set_crs(projection)
+        return self._cached("positions", positions, blocks=("main",)).copy()
 
     @property
     def area(self):
         """Returns the convex hull of all borehole positions"""
         import geopandas as gpd
-
-        positions = self.positions
-        return gpd.GeoDataFrame(geometry=[positions.unary_union.convex_hull]).set_crs(self.positions.crs)
+        import shapely
+
+        projection = self._checked_projection()
+        def area():
+            hull = spatial.convex_hull(self.main.x_coordinate, self.main.y_coordinate)
+            if len(hull) == 0:
+                geometry = shapely.Polygon()
+            elif len(hull) == 1:
+                geometry = shapely.Point(hull[0])
+            elif len(hull) == 2:
+                geometry = shapely.LineString(hull)
+            else:
+                geometry = shapely.Polygon(hull)
+            return gpd.GeoDataFrame(geometry=[geometry]).set_crs(projection)
+        return self._cached("area", area, blocks=("main",)).copy()
     
     @property
     def bounds(self):
-        return self.area.bounds
+        """Returns the bounding box of all borehole positions, as a
+        DataFrame with the columns minx, miny, maxx and maxy"""
+        self._checked_projection()
+        def bounds():
+            x = self.main.x_coordinate.to_numpy(dtype=float)
+            y = self.main.y_coordinate.to_numpy(dtype=float)
+            finite = np.isfinite(x) & np.isfinite(y)
+            x, y = x[finite], y[finite]
+            if not len(x):
+                return pd.DataFrame({"minx": [np.nan], "miny": [np.nan], "maxx": [np.nan], "maxy": [np.nan]})
+            return pd.DataFrame({"minx": [x.min()], "miny": [y.min()], "maxx": [x.max()], "maxy": [y.max()]})
+        return self._cached("bounds", bounds, blocks=("main",)).copy()
+
+class SGFDataBuilder(object):
+    """Collects SGFData objects, e.g. one per parsed file, and
+    concatenates each block only once, in finalize(). Appending to an
+    SGFData object one at a time in a loop instead copies all data
+    appended so far each time.
+
+    Borehole ids are checked for collisions between appended objects
+    as they are appended; a collision raises a ValueError, and leaves
+    the builder unchanged."""
+    def __init__(self, id_col="investigation_point"):
+        self.id_col = id_col
+        self.model_dicts = []
+        self.parse_errors = {}
+        self._ids = set()
+
+    def __len__(self):
+        return len(self.model_dicts)
+
+    def append(self, sgf):
+        """Adds an SGFData object, or a dict of main, data and method
+        DataFrames. Returns the builder itself."""
+        if isinstance(sgf, SGFData):
+            model_dict = sgf.model_dict
+            self.parse_errors.update(sgf.parse_errors)
+        else:
+            model_dict = sgf
+        main = model_dict.get("main")
+        if main is not None and self.id_col in main.columns:
+            ids = set(main[self.id_col].unique())
+            collisions = ids & self._ids
+            if collisions:
+                raise ValueError("%s is not unique for each borehole: %s" % (
+                    self.id_col, ", ".join(str(id) for id in sorted(collisions, key=str))))
+            self._ids.update(ids)
+        self.model_dicts.append(model_dict)
+        return self
+
+    def extend(self, sgfs):
+        for sgf in sgfs:
+            self.append(sgf)
+        return self
+
+    def finalize(self):
+        """Returns a single SGFData object with all appended data."""
+        res = SGFData(_concat_model_dicts(self.model_dicts), id_col=self.id_col)
+        res.parse_errors = dict(self.parse_errors)
+        return res
+
+from .dataset import SGFDataset, SGFDatasetWriter
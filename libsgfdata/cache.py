@@ -0,0 +1,184 @@
+import hashlib
+import importlib.metadata
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 2
+
+def _library_version():
+    try:
+        return importlib.metadata.version("libsgfdata")
+    except importlib.metadata.PackageNotFoundError:
+        # Not installed, e.g. when running from a source checkout;
+        # use a hash of the source code instead.
+        h = hashlib.sha256()
+        basedir = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(basedir)):
+            if name.endswith(".py") or name.endswith(".csv"):
+                with open(os.path.join(basedir, name), "rb") as f:
+                    h.update(f.read())
+        return "source-" + h.hexdigest()[:16]
+
+version = _library_version()
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ParseCache(object):
+    """On-disk cache of parsed files, keyed by file content.
+
+    Entries are the main, data and method DataFrames of a file, as
+    parsed by SGFData(path), stored as a directory with one parquet
+    file per block, see libsgfdata.parquet. The key is a hash
+    of the file content, the library version and the parse options,
+    so a changed file or library is simply a cache miss. The least
+    recently used entries are removed when the cache grows beyond
+    max_size bytes.
+
+    The size of the cache is scanned once, and then kept up to date as
+    entries are added and removed; the directory is only rescanned
+    when the size goes beyond max_size, or by size(), e.g. to catch
+    up with other processes using the same directory.
+
+    Requires pyarrow (pip install libsgfdata[parquet])."""
+    def __init__(self, cache_dir, max_size=1 << 30):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(size for mtime, size, path in self._entries())
+
+    def key(self, path, **options):
+        """Returns the cache key for path parsed with options (the
+        keyword arguments to SGFData() that affect parsing). Keys
+        start with the hash of the file content."""
+        h = hashlib.sha256()
+        # The dtypes that Arrow columns are read back as depend on the
+        # pandas and numpy versions
+        h.update(repr((FORMAT, version, pd.__version__, np.__version__, sorted(options.items()))).encode("utf-8"))
+        return "%s-%s" % (file_hash(path), h.hexdigest()[:32])
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".parquet")
+
+    def get(self, key):
+        """Returns the cached model dict for key, or None."""
+        from . import parquet
+        path = self._path(key)
+        try:
+            # Blocks are written unsorted, so rows keep their order
+            names = os.listdir(path)
+            res = {name: parquet.read_block(os.path.join(path, name + ".parquet"))
+                   for name in parquet.BLOCKS if name + ".parquet" in names}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable cache entry %s: %s" % (path, e))
+            self._remove(path)
+            return None
+        # The modification time is used as the last use time for LRU
+        # eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return res
+
+    def put(self, key, model_dict):
+        from . import parquet
+        path = self._path(key)
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            for name, block in model_dict.items():
+                if block is not None:
+                    parquet.write_block(block, os.path.join(tmp, name + ".parquet"), id_col=None)
+            size = self._entry_size(tmp)
+            self._remove(path)
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # Another process stored the same entry in between
+                if not os.path.isdir(path):
+                    raise
+                self._remove(tmp)
+                return
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self._size += size
+        if self.max_size is not None and self._size > self.max_size:
+            self.evict()
+
+    def load(self, path, parse, **options):
+        """Returns the cached model dict for path, or the result of
+        parse(), which is then stored in the cache."""
+        key = self.key(path, **options)
+        res = self.get(key)
+        if res is None:
+            res = parse()
+            self.put(key, res)
+        return res
+
+    @staticmethod
+    def _entry_size(path):
+        return sum(os.stat(os.path.join(path, name)).st_size for name in os.listdir(path))
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".parquet"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.stat(path).st_mtime, self._entry_size(path), path))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def size(self):
+        """Returns the size of the cache in bytes, rescanning the
+        directory."""
+        self._size = sum(size for mtime, size, path in self._entries())
+        return self._size
+
+    def evict(self):
+        """Removes the least recently used entries until the cache
+        is no larger than max_size."""
+        if self.max_size is None:
+            return
+        entries = sorted(self._entries())
+        self._size = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if self._size <= self.max_size:
+                break
+            self._remove(path)
+
+    def invalidate(self, path):
+        """Removes all entries for the content of path."""
+        prefix = file_hash(path) + "-"
+        for mtime, size, entry in self._entries():
+            if os.path.basename(entry).startswith(prefix):
+                self._remove(entry)
+
+    def clear(self):
+        """Removes all entries."""
+        for mtime, size, path in self._entries():
+            self._remove(path)
+
+    def _remove(self, path):
+        try:
+            size = self._entry_size(path)
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            return
+        if path.endswith(".parquet"):
+            self._size -= size
@@ -0,0 +1,203 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from . import spatial
+
+FORMAT = 2
+MANIFEST = "manifest.json"
+
+class SGFDatasetWriter(object):
+    """Writes an on-disk dataset, see SGFDataset, from SGFData objects
+    appended one at a time, e.g. one per parsed file. Data is written
+    to a new shard whenever at least shard_rows data rows have been
+    appended, so only about one shard of data is held in memory. Main
+    and method rows are kept in memory, and written by close().
+
+        with SGFDatasetWriter("archive.sgfds") as writer:
+            for path in paths:
+                writer.append(SGFData(path))
+
+    Requires pyarrow (pip install libsgfdata[parquet])."""
+    def __init__(self, path, shard_rows=1000000, id_col="investigation_point"):
+        self.path = path
+        self.shard_rows = shard_rows
+        self.id_col = id_col
+        os.makedirs(path, exist_ok=True)
+        self.mains = []
+        self.methods = []
+        self.shards = []
+        # Boreholes belong to the shard being filled when they are
+        # appended, so main rows are in shard order, and the number of
+        # main rows of each shard is enough to find the shard of each
+        # borehole. The last entry counts the boreholes appended after
+        # the last shard, which have no data.
+        self.main_rows = [0]
+        self._datas = []
+        self._data_rows = 0
+        self._ids = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+
+    def append(self, sgf, flush=False):
+        """Adds all boreholes of an SGFData object. A borehole id
+        that has already been appended raises a ValueError. With
+        flush=True, the data appended so far is written as a shard,
+        so that the boreholes appended next start a new shard."""
+        main = sgf.main
+        ids = set(main[self.id_col].unique())
+        collisions = ids & self._ids
+        if collisions:
+            raise ValueError("%s is not unique for each borehole: %s" % (
+                self.id_col, ", ".join(str(id) for id in sorted(collisions, key=str))))
+        self._ids.update(ids)
+        self.mains.append(main)
+        self.main_rows[-1] += len(main)
+        if sgf.method is not None and len(sgf.method):
+            self.methods.append(sgf.method)
+        if sgf.data is not None and len(sgf.data):
+            self._datas.append(sgf.data)
+            self._data_rows += len(sgf.data)
+        if flush or self._data_rows >= self.shard_rows:
+            self._flush()
+        return self
+
+    def _flush(self):
+        from . import _concat
+        from . import parquet
+        if not self._datas:
+            return
+        data = _concat(self._datas, ignore_index=True)
+        name = "data-%05d.parquet" % len(self.shards)
+        parquet.write_block(data, os.path.join(self.path, name), id_col=self.id_col)
+        self.shards.append({"file": name, "rows": len(data)})
+        self.main_rows.append(0)
+        self._datas = []
+        self._data_rows = 0
+
+    def close(self):
+        from . import _concat
+        from . import parquet
+        self._flush()
+        main = _concat(self.mains, ignore_index=True) if self.mains else pd.DataFrame(columns=[self.id_col])
+        method = _concat(self.methods, ignore_index=True) if self.methods else pd.DataFrame(columns=[self.id_col])
+        shard = np.repeat(np.arange(len(self.main_rows)), self.main_rows)
+        for col, coord, fn in (("minx", "x_coordinate", "min"), ("miny", "y_coordinate", "min"),
+                               ("maxx", "x_coordinate", "max"), ("maxy", "y_coordinate", "max")):
+            if coord in main.columns:
+                values = main[coord].groupby(shard).agg(fn)
+                for idx, info in enumerate(self.shards):
+                    value = values.get(idx, np.nan)
+                    info[col] = None if pd.isnull(value) else float(value)
+        # Main is written unsorted, in shard order
+        parquet.write_block(main, os.path.join(self.path, "main.parquet"), id_col=None)
+        parquet.write_block(method, os.path.join(self.path, "method.parquet"), id_col=self.id_col)
+        with open(os.path.join(self.path, MANIFEST), "w") as f:
+            json.dump({"format": FORMAT,
+                       "id_col": self.id_col,
+                       "main_rows": self.main_rows,
+                       "shards": self.shards}, f)
+
+class SGFDataset(object):
+    """An on-disk dataset too large to load into one SGFData object.
+
+    The dataset is a directory with the main and method rows of all
+    boreholes, and the data rows partitioned by borehole into shards,
+    all as parquet files (see libsgfdata.parquet), and a JSON manifest
+    of the shards. Queries load only the shards of the selected
+    boreholes, and optionally only some data columns, and return
+    normal in-memory SGFData objects. Write datasets with
+    SGFDatasetWriter or SGFData.to_dataset().
+
+    Requires pyarrow (pip install libsgfdata[parquet])."""
+    def __init__(self, path):
+        from . import parquet
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest["format"] != FORMAT:
+            raise ValueError("Unsupported dataset format %s" % (manifest["format"],))
+        self.id_col = manifest["id_col"]
+        self.main = parquet.read_block(os.path.join(path, "main.parquet"))
+        self.method = parquet.read_block(os.path.join(path, "method.parquet"))
+        self.shard = np.repeat(np.arange(len(manifest["main_rows"])), manifest["main_rows"])
+        self.shards = pd.DataFrame(manifest["shards"], columns=["file", "rows", "minx", "miny", "maxx", "maxy"])
+        self._spatial_index = None
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def __len__(self):
+        return len(self.main)
+
+    def __repr__(self):
+        return "SGFDataset(%r): %s boreholes, %s depth rows in %s shards" % (
+            self.path, len(self.main), self.shards["rows"].sum(), len(self.shards))
+
+    def load_shard(self, shard, ids=None, columns=None):
+        """Returns the data rows of one shard as a DataFrame,
+        optionally only for the boreholes with the given ids, and only
+        the given columns."""
+        from . import parquet
+        if columns is not None:
+            columns = [self.id_col] + [col for col in columns if col != self.id_col]
+        return parquet.read_block(os.path.join(self.path, self.shards["file"].iloc[shard]),
+                                  ids=ids, columns=columns)
+
+    def select(self, ids=None, bbox=None, method_code=None, columns=None):
+        """Returns an SGFData object with the boreholes matching all
+        of the given criteria: ids a list of borehole ids, bbox a tuple
+        (xmin, ymin, xmax, ymax) and method_code a method code or
+        list of codes. Only the shards of the matching boreholes are
+        read, and of them only the given data columns, if any."""
+        filt = np.ones(len(self.main), dtype=bool)
+        if ids is not None:
+            filt &= self.main[self.id_col].isin(list(ids)).to_numpy()
+        if bbox is not None:
+            if self._spatial_index is None:
+                self._spatial_index = spatial.KDTree(self.main.x_coordinate, self.main.y_coordinate)
+            inside = np.zeros(len(self.main), dtype=bool)
+            inside[self._spatial_index.within_bbox(*bbox)] = True
+            filt &= inside
+        if method_code is not None:
+            codes = list(method_code) if isinstance(method_code, (list, tuple, set)) else [method_code]
+            filt &= self.main.method_code.isin(codes).to_numpy()
+        return self._load(filt, columns)
+
+    def borehole(self, id):
+        return self.select(ids=[id])
+
+    def within_bbox(self, xmin, ymin, xmax, ymax):
+        return self.select(bbox=(xmin, ymin, xmax, ymax))
+
+    def iter_shards(self, columns=None):
+        """Yields an SGFData object per shard, with its boreholes, so
+        that the whole dataset can be processed one shard at a time."""
+        for shard in range(len(self.shards)):
+            yield self._load(self.shard == shard, columns)
+        unsharded = self.shard >= len(self.shards)
+        if unsharded.any():
+            yield self._load(unsharded, columns)
+
+    def _load(self, filt, columns=None):
+        from . import SGFData, _concat
+        main = self.main[filt]
+        ids = list(main[self.id_col].unique())
+        datas = [self.load_shard(shard, ids=ids, columns=columns)
+                 for shard in np.unique(self.shard[filt])
+                 if shard < len(self.shards)]
+        if datas:
+            data = _concat(datas, ignore_index=True)
+        else:
+            data = pd.DataFrame(columns=[self.id_col])
+        method = self.method[self.method[self.id_col].isin(ids)]
+        return SGFData({"main": main.reset_index(drop=True),
+                        "data": data,
+                        "method": method.reset_index(drop=True)},
+                       id_col=self.id_col)
@@ -0,0 +1,85 @@
+import pandas as pd
+import numpy as np
+from . import metadata
+
+# Data block columns that hold plain measurements (as opposed to
+# dates, times, comments etc), and that can therefore be stored in a
+# more compact numeric type if their values allow it.
+measurement_columns = set(metadata.data.loc[metadata.data.type.isna(), "ident"].dropna())
+
+def _float32(values):
+    """Returns values as float32 if every value survives the round
+    trip to float32 and back through its shortest string
+    representation (which is what SGF files contain), else None."""
+    with np.errstate(over="ignore", invalid="ignore"):
+        compact = values.astype(np.float32)
+    if not np.array_equal(expand_float(compact), values, equal_nan=True):
+        return None
+    return compact
+
+def expand_float(values):
+    """Converts a float32 array back to float64 without introducing
+    binary noise, e.g. float32(0.1) becomes 0.1 and not
+    0.10000000149011612."""
+    return np.asarray(values).astype(str).astype(np.float64)
+
+def _int(values):
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if not len(values) or (values.min() >= info.min and values.max() <= info.max):
+            return values.astype(dtype)
+    return None
+
+def compact(data, id_col="investigation_point"):
+    """Stores measurement columns as float32 where that is lossless,
+    integer columns as the smallest int type that fits, and the id
+    column as a categorical.
+
+    Returns the new DataFrame, and a report DataFrame with the memory
+    use of each changed column before and after."""
+    columns = {}
+    for col in data.columns:
+        dtype = data[col].dtype
+        if col == id_col:
+            if not isinstance(dtype, pd.CategoricalDtype):
+                columns[col] = data[col].astype("category")
+            continue
+        if col not in measurement_columns or not isinstance(dtype, np.dtype):
+            continue
+        values = data[col].to_numpy()
+        if dtype == np.float64:
+            values = _float32(values)
+        elif dtype == np.int64:
+            values = _int(values)
+        else:
+            continue
+        if values is not None:
+            columns[col] = pd.Series(values, index=data.index, name=col)
+    report = pd.DataFrame(
+        [{"column": col,
+          "dtype": str(data[col].dtype),
+          "compact_dtype": str(series.dtype),
+          "bytes": data[col].memory_usage(index=False, deep=True),
+          "compact_bytes": series.memory_usage(index=False, deep=True)}
+         for col, series in columns.items()],
+        columns=["column", "dtype", "compact_dtype", "bytes", "compact_bytes"]).set_index("column")
+    report["saved"] = report["bytes"] - report["compact_bytes"]
+    return (data.assign(**columns) if columns else data), report
+
+def expand(data):
+    """Reverts the float32 columns created by compact() to float64."""
+    columns = {col: expand_float(data[col]) for col, dtype in data.dtypes.items() if dtype == np.float32}
+    return data.assign(**columns) if columns else data
+
+policies = {None: None, "default": None, "compact": compact}
+
+def apply_policy(data, policy, id_col="investigation_point"):
+    """Applies the named dtype policy to a data block. Returns the
+    new DataFrame and a report of the bytes saved (None for the
+    default policy)."""
+    if policy not in policies:
+        raise ValueError("Unknown dtype_policy %s, must be one of %s" % (
+            policy, ", ".join(str(name) for name in policies if name is not None)))
+    if policies[policy] is None or data is None:
+        return data, None
+    return policies[policy](data, id_col=id_col)
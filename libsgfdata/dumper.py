@@ -3,14 +3,14 @@ import pkg_resources
 import pandas as pd
 import numpy as np
 import slugify
-import codecs
-import copy
 import dateutil.parser
 import datetime
 import logging
 from pathlib import Path
 import sys
 from . import metadata
+from . import dtypes
+from . import index
 
 logger = logging.getLogger(__name__)
 
@@ -30,44 +30,112 @@ def _dump_line(block, line):
                     for k,v in line.items()
                     if str(v) and not pd.isnull(v))
 
-def _dump_raw(sections, output_filename=None, *arg, **kw):
+def _dump_column(block, key, values):
+    """Formats a column as "key=value," items, with "" for missing
+    and empty values, like _dump_line() does for single values."""
+    prefix = key + "="
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Format each category once; code -1 (missing) picks the last item
+        items = [prefix + _unconv(block, key, value) + "," if str(value) else ""
+                 for value in values.cat.categories]
+        return np.array(items + [""], dtype=object)[values.cat.codes.to_numpy()]
+    kind = values.dtype.kind
+    if kind in "iub" and not values.hasnans:
+        return np.array([prefix + str(value) + "," for value in values.tolist()], dtype=object)
+    # Also masks pd.NA of nullable integer, boolean and float columns
+    missing = values.isna().to_numpy()
+    if kind in "iubf":
+        strs = np.array(list(map(str, values.tolist())), dtype=object)
+    else:
+        if kind in "OM":
+            strs = np.array([_unconv(block, key, value) if not isnull else ""
+                             for value, isnull in zip(values.tolist(), missing)], dtype=object)
+        else:
+            strs = np.array(list(map(str, values.tolist())), dtype=object)
+        missing = missing | (strs == "")
+    items = prefix + strs + ","
+    items[missing] = ""
+    return items
+
+def _dump_lines(block, frame):
+    """Formats all rows of a DataFrame block, one column at a time,
+    as a list of lines."""
+    if not len(frame):
+        return []
+    columns = [_dump_column(block, key, values).tolist() for key, values in frame.items()]
+    if not columns:
+        return ["\n"] * len(frame)
+    # Each item ends with a comma, so the last one is cut off each line
+    return ["".join(items)[:-1] + "\n" for items in zip(*columns)]
+
+def _dump_frame(block, frame):
+    return "".join(_dump_lines(block, frame))
+
+def _dump_block(blockname, rows):
+    block = metadata.blocknames.get(blockname)
+    if isinstance(rows, pd.DataFrame):
+        return blockname + "\n" + _dump_frame(block, rows)
+    return blockname + "\n" + "".join(_dump_line(block, row) + "\n" for row in rows)
+
+def _has_rows(block):
+    return len(block) > 0 if isinstance(block, pd.DataFrame) else bool(block)
+
+def _iter_sections(sections):
+    """Yields the text of each section."""
+    for section in sections:
+        yield "".join(_dump_block(blockname, section.get(blockname, []))
+                      for blockname in ("$", "£", "#", "€", "#$")
+                      if blockname == "$" or (blockname in section and _has_rows(section[blockname])))
+
+def _iter_chunks(texts, encoding="latin-1", chunk_size=1 << 20):
+    """Joins texts into encoded chunks of at least chunk_size
+    characters, except for the last one. A text is never split, so a
+    chunk can be larger."""
+    chunk = []
+    chunk_len = 0
+    for text in texts:
+        chunk.append(text)
+        chunk_len += len(text)
+        if chunk_len >= chunk_size:
+            yield "".join(chunk).encode(encoding, errors="ignore")
+            chunk = []
+            chunk_len = 0
+    if chunk:
+        yield "".join(chunk).encode(encoding, errors="ignore")
+
+def _dump_texts(texts, output_filename=None, *arg, **kw):
     if isinstance(output_filename, str):
         with open(output_filename, "wb") as f:
-            _dump_raw_to_file(sections, f, *arg, **kw)
+            _dump_texts(texts, f, *arg, **kw)
     elif output_filename is not None:
-        _dump_raw_to_file(sections, output_filename, *arg, **kw)
+        for chunk in _iter_chunks(texts, *arg, **kw):
+            output_filename.write(chunk)
     else:
         raise ValueError(f'output_filename must a string or file handle, but you provided {type(output_filename)}.\n'
                          f'{output_filename=}')
 
-def _dump_raw_to_file(sections, f, encoding="latin-1"):
-    f = codecs.getwriter(encoding)(f, errors='ignore')
-    for section in sections:
-        for blockname in ("$", "£", "#", "€", "#$"):
-            if blockname == "$" or (blockname in section and section[blockname]):
-                f.write(blockname + "\n")
-                for row in section.get(blockname, []):
-                    f.write(_dump_line(metadata.blocknames[blockname], row) + "\n")
+def _dump_raw(sections, *arg, **kw):
+    _dump_texts(_iter_sections(sections), *arg, **kw)
 
 def _unrename_blocks(sections):
     for idx in range(len(sections)):
         sections[idx] = {metadata.unblocknames.get(name, name): block
                          for name, block in sections[idx].items()}
 
-def _unmake_dfs(sections):
+def _expand_dtypes(sections):
     for idx in range(len(sections)):
         if "data" in sections[idx]:
-            sections[idx]["data"] = sections[idx]["data"].to_dict('records')
+            sections[idx]["data"] = dtypes.expand(sections[idx]["data"])
 
 def _unrename_data_columns(sections):
     for idx in range(len(sections)):
         if "data" in sections[idx]:
-            sections[idx]["data"] = sections[idx]["data"].rename(columns = metadata.undata.code.to_dict())
+            sections[idx]["data"] = sections[idx]["data"].rename(columns = metadata.data_codes)
 
 def _unrename_main(sections):
     for idx in range(len(sections)):
         sections[idx]["main"] = [
-            {metadata.unmain.loc[key, "code"] if key in metadata.unmain.index else key: value
+            {metadata.main_codes.get(key, key): value
              for key, value in row.items()}
             for row in sections[idx]["main"]]
 
@@ -76,7 +144,7 @@ def _unrename_method(sections):
         if "method" not in sections[idx]:
             continue
         sections[idx]["method"] = [
-            {metadata.unmethod.loc[key, "code"] if key in metadata.unmethod.index else key: value
+            {metadata.method_codes.get(key, key): value
              for key, value in row.items()}
             for row in sections[idx]["method"]]
         
@@ -85,38 +153,131 @@ def _unrename_values_method_code(sections):
         for row in section["main"]:
             if 'method_code' in row:
                 code = str(row['method_code'])
-                if code in metadata.unmethods.index:
-                    row['method_code'] = metadata.unmethods.loc[code, "code"]
+                if code in metadata.methods_codes:
+                    row['method_code'] = metadata.methods_codes[code]
 
 def _unrename_values_comments(sections):
     key = "comments"
     for section in sections:
-        if key in section["data"].columns:
-            codes = section["data"][key]
-            missing = list(set(codes.unique()) - set(metadata.uncomments.index))
-            labels = pd.concat((metadata.uncomments,
-                                pd.DataFrame([{"code": code} for code in missing], index=missing)))
-            section["data"][key] = labels.loc[codes, "code"].values
+        if "data" in section and key in section["data"].columns:
+            section["data"][key] = metadata.uncategorical(section["data"][key], metadata.comments_codes)
 
 def _unrename_values_data_flags(sections):
     key = "allocated_value_during_performance_of_sounding"
     for section in sections:
-        if key in section["data"].columns:
-            codes = section["data"][key]
-            missing = list(set(codes.unique()) - set(metadata.undata_flags.index))
-            labels = pd.concat((metadata.undata_flags,
-                                pd.DataFrame([{"code": code} for code in missing], index=missing)))
-            section["data"][key] = labels.loc[codes, "code"].values
+        if "data" in section and key in section["data"].columns:
+            section["data"][key] = metadata.uncategorical(section["data"][key], metadata.data_flags_codes)
                     
+def _copy_sections(sections):
+    # The unrename steps below replace whole data columns, and rows
+    # and values of the main and method blocks, so copying the blocks
+    # and rows is enough to leave the input unchanged. Keys that are
+    # not blocks, e.g. the data_offsets of scan_headers(), are not
+    # dumped, and so left out.
+    return [{name: block.copy(deep=False) if isinstance(block, pd.DataFrame) else [dict(row) for row in block]
+             for name, block in section.items()
+             if name in metadata.unblocknames}
+            for section in sections]
+
+def _unrename_sections(sections):
+    """Yields copies of sections with column names and values in SGF
+    format, one section at a time."""
+    for section in sections:
+        copies = _copy_sections([section])
+        _unrename_values_data_flags(copies)
+        _unrename_values_comments(copies)
+        _unrename_data_columns(copies)
+        _expand_dtypes(copies)
+        _unrename_method(copies)
+        _unrename_values_method_code(copies)
+        _unrename_main(copies)
+        _unrename_blocks(copies)
+        yield copies[0]
+
 def dump(sections, *arg, **kw):
-    sections = copy.deepcopy(sections)    
-    _unrename_values_data_flags(sections)
-    _unrename_values_comments(sections)
-    _unrename_data_columns(sections)
-    _unmake_dfs(sections)
-    _unrename_method(sections)
-    _unrename_values_method_code(sections)
-    _unrename_main(sections)
-    _unrename_blocks(sections)
-    sections = _dump_raw(sections, *arg, **kw)
-    return sections
+    _dump_raw(_unrename_sections(sections), *arg, **kw)
+
+def iter_dump(sections, encoding="latin-1", chunk_size=1 << 16):
+    """Yields sections in SGF format as encoded byte chunks of about
+    chunk_size bytes, each holding whole boreholes. Sections are
+    formatted as the chunks are consumed, so sections can be a
+    generator, e.g. from iter_sections(), and the output can be
+    streamed, e.g. as an HTTP response, without being held in
+    memory."""
+    return _iter_chunks(_iter_sections(_unrename_sections(sections)), encoding, chunk_size)
+
+def dumps(sections, encoding="latin-1"):
+    """Returns sections in SGF format as bytes."""
+    return b"".join(iter_dump(sections, encoding))
+
+def _unrename_model_dict(model_dict):
+    """Like the _unrename_* steps of dump(), but for whole blocks."""
+    res = {}
+    if "main" in model_dict:
+        main = model_dict["main"]
+        if "method_code" in main.columns:
+            main = main.assign(method_code=np.array(
+                [metadata.methods_codes.get(str(code), code) for code in main["method_code"].tolist()], dtype=object))
+        res["main"] = main.rename(columns=metadata.main_codes)
+    if "data" in model_dict:
+        data = model_dict["data"]
+        columns = {key: metadata.uncategorical(data[key], codes)
+                   for key, codes in (("allocated_value_during_performance_of_sounding", metadata.data_flags_codes),
+                                      ("comments", metadata.comments_codes))
+                   if key in data.columns}
+        res["data"] = dtypes.expand(data.assign(**columns) if columns else data).rename(columns=metadata.data_codes)
+    if "method" in model_dict:
+        res["method"] = model_dict["method"].rename(columns=metadata.method_codes)
+    return res
+
+def _iter_model_dict_batch(model_dict, id_col):
+    blocks = {}
+    for name, frame in _unrename_model_dict(model_dict).items():
+        groups = index.GroupIndex(model_dict[name][id_col])
+        blocks[name] = (groups, _dump_lines(name, groups.sort(frame)))
+    main_groups, main_lines = blocks.pop("main")
+    for section_id in main_groups.keys:
+        text = ["$\n"] + main_lines[main_groups.slice(section_id)]
+        for name, blockname in (("data", "#"), ("method", "€")):
+            if name in blocks:
+                groups, lines = blocks[name]
+                rows = lines[groups.slice(section_id)]
+                if rows:
+                    text.append(blockname + "\n")
+                    text.extend(rows)
+        yield "".join(text)
+
+def _iter_model_dict(model_dict, id_col="investigation_point", batch_rows=65536):
+    """Yields the text of each borehole of a model dict, in the same
+    format as dump(geotech_set_to_sections(model_dict)). Boreholes are
+    formatted in batches of about batch_rows data rows, each block of
+    a batch as a whole."""
+    if "main" not in model_dict:
+        return
+    blocks = {}
+    for name in ("main", "data", "method"):
+        if name in model_dict:
+            groups = index.GroupIndex(model_dict[name][id_col])
+            blocks[name] = (groups, groups.sort(model_dict[name]))
+    ids = blocks["main"][0].keys
+    batch = np.zeros(len(ids), dtype=int)
+    if "data" in blocks:
+        counts = blocks["data"][0].counts(ids)
+        batch = (np.cumsum(counts) - counts) // batch_rows
+    for positions in np.split(np.arange(len(ids)), np.flatnonzero(np.diff(batch)) + 1):
+        if not len(positions):
+            continue
+        batch_ids = [ids[pos] for pos in positions]
+        yield from _iter_model_dict_batch(
+            {name: frame.iloc[groups.rows(batch_ids)] for name, (groups, frame) in blocks.items()}, id_col)
+
+def dump_model_dict(model_dict, *arg, id_col="investigation_point", **kw):
+    """Writes a model dict (see SGFData.model_dict) in SGF format,
+    streaming it borehole by borehole without splitting it into
+    sections first. The output is the same as for
+    dump(geotech_set_to_sections(model_dict, id_col))."""
+    _dump_texts(_iter_model_dict(model_dict, id_col), *arg, **kw)
+
+def iter_dump_model_dict(model_dict, id_col="investigation_point", encoding="latin-1", chunk_size=1 << 16):
+    """Like iter_dump(), but for a model dict, see dump_model_dict()."""
+    return _iter_chunks(_iter_model_dict(model_dict, id_col), encoding, chunk_size)
@@ -0,0 +1,54 @@
+import pandas as pd
+import numpy as np
+
+class GroupIndex(object):
+    """Groups the rows of a column by value, in order of first
+    appearance, with a single stable sort.
+
+    The rows with value keys[i] are rows order[starts[i]:stops[i]];
+    order is None when equal values are already stored contiguously
+    (the common case for SGF data), so that each group is a plain
+    slice of the original rows. Missing values are not part of any
+    group."""
+    def __init__(self, values):
+        codes, keys = pd.factorize(values)
+        self.keys = list(keys)
+        self.groups = {key: idx for idx, key in enumerate(self.keys)}
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.keys))
+        self.stops = (codes < 0).sum() + np.cumsum(counts)
+        self.starts = self.stops - counts
+        order = np.argsort(codes, kind="stable")
+        self.order = None if np.array_equal(order, np.arange(len(codes))) else order
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.groups
+
+    def sort(self, frame):
+        """Returns frame with its rows grouped, so that slices of the
+        returned frame can be taken with slice()."""
+        return frame if self.order is None else frame.take(self.order)
+
+    def slice(self, key):
+        """Returns the slice of rows for key in the output of sort(),
+        or an empty slice if there are no rows for key."""
+        idx = self.groups.get(key)
+        if idx is None:
+            return slice(0, 0)
+        return slice(int(self.starts[idx]), int(self.stops[idx]))
+
+    def counts(self, keys):
+        """Returns the number of rows for each of keys."""
+        idx = np.array([self.groups.get(key, -1) for key in keys], dtype=int)
+        # Missing keys (-1) pick the trailing 0
+        return np.append(self.stops - self.starts, 0)[idx]
+
+    def rows(self, keys):
+        """Returns the row positions in the output of sort() of the
+        rows for all of keys, in the order of keys."""
+        slices = [self.slice(key) for key in keys]
+        if not slices:
+            return np.zeros(0, dtype=int)
+        return np.concatenate([np.arange(s.start, s.stop) for s in slices])
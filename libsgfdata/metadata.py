@@ -49,9 +49,52 @@ with pkg_resources.resource_stream("libsgfdata", "data-flags.csv") as f:
 # file format.
 # But seriously, why don't we all just use the ISO format?
 
+# Formats tried before falling back to dateutil, as it is both
+# much faster, and dateutil with dayfirst=True misreads YYYYMMDD and
+# can not parse YYYYMMDDHHMMSSmmm at all. Each format is only used
+# for values fully matching its regular expression.
+_DATE_FORMATS = [(re.compile(regex), fmt) for regex, fmt in [
+    (r"[0-9]{17}", "%Y%m%d%H%M%S%f"),
+    (r"[0-9]{14}", "%Y%m%d%H%M%S"),
+    (r"[0-9]{12}", "%Y%m%d%H%M"),
+    (r"[0-9]{8}", "%Y%m%d"),
+    (r"[0-9]{4}-[0-9]{2}-[0-9]{2}", "%Y-%m-%d"),
+    (r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}", "%Y-%m-%d %H:%M"),
+    (r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}", "%Y-%m-%d %H:%M:%S"),
+    (r"[0-9]{1,2}\.[0-9]{1,2}\.[0-9]{4}", "%d.%m.%Y"),
+    (r"[0-9]{1,2}/[0-9]{1,2}/[0-9]{4}", "%d/%m/%Y"),
+    # Two digit years are only used for whole columns, see _conv_dates_column()
+    (r"[0-9]{1,2}\.[0-9]{1,2}\.[0-9]{2}", "%d.%m.%y"),
+    (r"[0-9]{1,2}/[0-9]{1,2}/[0-9]{2}", "%d/%m/%y"),
+]]
+
+def _infer_date_format(v):
+    for regex, fmt in _DATE_FORMATS:
+        if regex.fullmatch(v):
+            return regex, fmt
+    return None, None
+
+def _strptime(v):
+    regex, fmt = _infer_date_format(v)
+    if fmt is None or fmt.endswith("%y"):
+        return None
+    try:
+        return datetime.datetime.strptime(v, fmt)
+    except ValueError:
+        return None
+
+def _dateutil_years(years):
+    """The years dateutil would pick for the two digit years years % 100."""
+    now = datetime.date.today().year
+    years = years % 100 + now // 100 * 100
+    return np.where(years >= now + 50, years - 100, np.where(years < now - 50, years + 100, years))
+
 def _conv_date(v):
     if pd.isnull(v):
         return pd.NaT
+    res = _strptime(v)
+    if res is not None:
+        return res.date()
     try:
         if len(v) >= 8:
             return dateutil.parser.isoparse(v).date()
@@ -67,12 +110,93 @@ def _conv_date(v):
 def _conv_datetime(v):
     if pd.isnull(v):
         return pd.NaT
+    res = _strptime(v)
+    if res is not None:
+        return res
     try:
         return dateutil.parser.parse(v, parserinfo=dateutil.parser.parserinfo(dayfirst=True))
     except Exception as e:
         logger.debug("Unable to parse datetime %s: %s" %(v,e))
         return v
 
+# Widths of the all-digit formats above, and the offsets of year,
+# month, day, hour, minute, second and millisecond in them
+_DIGIT_FORMATS = {
+    "%Y%m%d%H%M%S%f": [0, 4, 6, 8, 10, 12, 14, 17],
+    "%Y%m%d%H%M%S": [0, 4, 6, 8, 10, 12, 14],
+    "%Y%m%d%H%M": [0, 4, 6, 8, 10, 12],
+    "%Y%m%d": [0, 4, 6, 8],
+}
+
+def _parse_digits(strings, fmt):
+    """Vectorized equivalent of pd.to_datetime(strings, format=fmt,
+    errors="coerce") for the all-digit formats, working directly on
+    the digits of the strings. Invalid dates become NaT."""
+    offsets = _DIGIT_FORMATS[fmt]
+    width = offsets[-1]
+    digits = np.frombuffer(
+        np.array(strings, dtype="S%s" % width).tobytes(), dtype=np.uint8
+    ).reshape(-1, width).astype(np.int64) - ord("0")
+    fields = [digits[:, start:end] @ 10 ** np.arange(end - start - 1, -1, -1)
+              for start, end in zip(offsets[:-1], offsets[1:])]
+    fields += [0] * (7 - len(fields))
+    year, month, day, hour, minute, second, millisecond = fields
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days_in_month = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+    valid = ((year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= days_in_month)
+             & (hour < 24) & (minute < 60) & (second < 60))
+    res = (months.astype("datetime64[D]").astype("datetime64[us]")
+           + ((((day - 1) * 24 + hour) * 60 + minute) * 60 + second) * 1000000
+           + millisecond * 1000)
+    res[~valid] = np.datetime64("NaT")
+    return pd.Series(res)
+
+# The dtype pandas gives a column of datetime.datetime objects
+_DATETIME_DTYPE = pd.Series([datetime.datetime(2000, 1, 1)]).dtype
+
+def _conv_dates_column(values, conv, dates):
+    """Converts a whole column of raw strings (and NaN for missing
+    values) with a single format inferred from its first value,
+    falling back to conv() for the values that do not match it. The
+    result is the same as converting each value with conv()."""
+    values = np.array(values, dtype=object)
+    present = np.flatnonzero(~pd.isnull(values))
+    if not len(present):
+        return values.tolist()
+    regex, fmt = _infer_date_format(values[present[0]])
+    if fmt is None:
+        res = values.copy()
+        res[present] = [conv(v) for v in values[present]]
+        return res.tolist()
+
+    strings = pd.Series(values[present])
+    matches = strings.str.fullmatch(regex.pattern)
+    if fmt in _DIGIT_FORMATS:
+        parsed = _parse_digits(strings.where(matches, "0"), fmt)
+    else:
+        parsed = pd.to_datetime(strings.where(matches), format=fmt, errors="coerce")
+    failed = np.array(parsed.isna())
+    if fmt.endswith("%y"):
+        years = parsed.dt.year.values
+        failed |= years != _dateutil_years(years)
+
+    if not failed.any() and not dates:
+        res = pd.Series(pd.NaT, index=range(len(values)), dtype=parsed.dtype)
+        res.iloc[present] = parsed.values
+        return res.astype(_DATETIME_DTYPE).values
+
+    res = values.copy()
+    parsed = parsed[~failed]
+    res[present[~failed]] = parsed.dt.date.values if dates else parsed.dt.to_pydatetime()
+    res[present[failed]] = [conv(v) for v in values[present[failed]]]
+    return res.tolist()
+
+def _conv_date_column(values):
+    return _conv_dates_column(values, _conv_date, True)
+
+def _conv_datetime_column(values):
+    return _conv_dates_column(values, _conv_datetime, False)
 
 def _conv_time(v):
     """
@@ -91,15 +215,27 @@ def _conv_time(v):
         logger.debug("Unable to parse time %s: %s", v, e)
         return v
 
+def _conv_time_column(values):
+    """Converts a whole column with _conv_time, converting each
+    distinct value only once."""
+    converted = {}
+    def conv(v):
+        if v not in converted:
+            converted[v] = _conv_time(v)
+        return converted[v]
+    return [v if pd.isnull(v) else conv(v) for v in values]
+
+# conv converts a single value, colconv a whole column (list) of
+# values, see parser._ColumnarBlock
 typemap = pd.DataFrame([
-    {"name": "NAN", "conv": np.nan},
-    {"name": "date", "conv": _conv_date},
-    {"name": "datum_for_undersokning", "conv": _conv_date},
-    {"name": "date_reference_measurement", "conv": _conv_date},
-    {"name": "datetime", "conv": _conv_datetime},
-    {"name": "time", "conv": _conv_time},
-    {"name": "seconds", "conv": np.nan},
-    {"name": "milliseconds", "conv": np.nan},
+    {"name": "NAN", "conv": np.nan, "colconv": np.nan},
+    {"name": "date", "conv": _conv_date, "colconv": _conv_date_column},
+    {"name": "datum_for_undersokning", "conv": _conv_date, "colconv": _conv_date_column},
+    {"name": "date_reference_measurement", "conv": _conv_date, "colconv": _conv_date_column},
+    {"name": "datetime", "conv": _conv_datetime, "colconv": _conv_datetime_column},
+    {"name": "time", "conv": _conv_time, "colconv": _conv_time_column},
+    {"name": "seconds", "conv": np.nan, "colconv": np.nan},
+    {"name": "milliseconds", "conv": np.nan, "colconv": np.nan},
 ]).set_index("name")
 
 for block in block_metadata.values():
@@ -139,3 +275,46 @@ undata = data.reset_index().drop_duplicates("ident").set_index("ident")
 unmethods = methods.reset_index().drop_duplicates("ident").set_index("ident")
 uncomments = comments.reset_index().drop_duplicates("ident").set_index("ident")
 undata_flags = data_flags.reset_index().drop_duplicates("ident").set_index("ident")
+
+# Plain dict translation tables between codes and idents, used by
+# the rename passes of the parser and dumper
+main_idents = main.ident.to_dict()
+method_idents = method.ident.to_dict()
+data_idents = data.ident.to_dict()
+methods_idents = methods.ident.to_dict()
+comments_idents = comments.ident.to_dict()
+data_flags_idents = data_flags.ident.to_dict()
+
+main_codes = unmain.code.to_dict()
+method_codes = unmethod.code.to_dict()
+data_codes = undata.code.to_dict()
+methods_codes = unmethods.code.to_dict()
+comments_codes = uncomments.code.to_dict()
+data_flags_codes = undata_flags.code.to_dict()
+
+# Categories of the categorical columns holding idents from these
+# tables, see categorical()
+methods_categories = list(unmethods.index)
+comments_categories = list(uncomments.index)
+data_flags_categories = list(undata_flags.index)
+
+def categorical(values, categories, mapping=None):
+    """Converts values to a pd.Categorical with the given categories,
+    followed by any other values in order of appearance. If mapping
+    is given, each distinct value is first replaced by
+    mapping.get(value, value)."""
+    inverse, uniques = pd.factorize(np.asarray(values, dtype=object))
+    if mapping is not None:
+        uniques = [mapping.get(value, value) for value in uniques]
+    categories = dict.fromkeys(categories)
+    categories.update(dict.fromkeys(uniques))
+    positions = {category: idx for idx, category in enumerate(categories)}
+    positions = np.array([positions[value] for value in uniques] + [-1], dtype=int)
+    return pd.Categorical.from_codes(positions[inverse], categories=list(categories))
+
+def uncategorical(values, mapping):
+    """Replaces each value with mapping.get(value, value), mapping each
+    category only once, and returns an object array. NaN stays NaN."""
+    values = pd.Categorical(values)
+    categories = [mapping.get(category, category) for category in values.categories]
+    return np.array(categories + [np.nan], dtype=object)[values.codes]
@@ -201,10 +201,12 @@ def normalize_stop_code(sgf):
     last_comment = sgf.main[[sgf.id_col]].merge(
         sgf.data.groupby(sgf.id_col).comments.last().rename("last_comment"),
         left_on=sgf.id_col, right_index=True, how="left")
-    sgf.main["stop_code"] = np.where(pd.isnull(sgf.main.stop_code), last_comment.last_comment, sgf.main.stop_code)
+    sgf.main["stop_code"] = metadata.categorical(
+        np.where(pd.isnull(sgf.main.stop_code), last_comment.last_comment, sgf.main.stop_code),
+        metadata.comments_categories)
     
 def normalize_columns(sgf):
-    for blockname, block in sgf._model_dict.items():
+    for blockname, block in list(sgf._model_dict.items()):
         if blockname not in metadata.block_metadata:
             continue
         normalization = metadata.block_metadata[blockname].loc[
@@ -212,11 +214,16 @@ def normalize_columns(sgf):
         ].set_index("ident").normalization
         normalization = metadata.block_metadata[blockname].loc[normalization].set_index(normalization.index).ident
 
+        # Columns are replaced rather than modified in place, so that
+        # blocks shared with a shallow copy are left untouched
         for src, dst in normalization.to_dict().items():
             if src in block.columns:
-                filt = ~pd.isnull(block[src]) 
-                block.loc[filt, dst] = block.loc[filt, src]
-                block.drop(columns=[src], inplace=True)
+                filt = ~pd.isnull(block[src])
+                values = block[dst] if dst in block.columns else pd.Series(np.nan, index=block.index)
+                values = values.mask(filt, block[src])
+                block = block.drop(columns=[src])
+                block[dst] = values
+        sgf._model_dict[blockname] = block
         
         #block.rename(columns=normalization.to_dict(), inplace=True)
 
@@ -260,7 +267,7 @@ def normalize_depth(sgf, summarize_depth=True,
                                      sgf.main.depth_max,
                                      sgf.main.depth)
     
-        sgf.main.loc[last_depth.index, "depth_max_drilled"] = last_depth.last_depth
+        sgf.main["depth_max_drilled"] = last_depth.last_depth.values
 
 def normalize_id(sgf):
     sgf.main[sgf.id_col] = sgf.main[sgf.id_col].astype(str)
@@ -268,18 +275,16 @@ def normalize_id(sgf):
     if sgf.method is not None: sgf.method[sgf.id_col] = sgf.method[sgf.id_col].astype(str)
     
 def normalize_order(sgf):
-    sgf.main.sort_values([sgf.id_col], inplace=True)
+    sgf.main = sgf.main.sort_values([sgf.id_col]).reset_index(drop=True)
     sort_cols = [sgf.id_col]
 
     if "start_depth" in sgf.data.columns:
         sort_cols.append("start_depth")
     if "depth" in sgf.data.columns:
         sort_cols.append("depth")
-    sgf.data.sort_values(sort_cols, inplace=True)
+    sgf.data = sgf.data.sort_values(sort_cols).reset_index(drop=True)
 
-    sgf.main.reset_index(inplace=True, drop=True)
-    if sgf.data is not None: sgf.data.reset_index(inplace=True, drop=True)
-    if sgf.method is not None: sgf.method.reset_index(inplace=True, drop=True)
+    if sgf.method is not None: sgf.method = sgf.method.reset_index(drop=True)
     
 def normalize(sgf, sort=False, summarize_depth=True, **kw):    
     if "investigation_point" not in sgf.main.columns:
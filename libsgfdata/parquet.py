@@ -0,0 +1,123 @@
+import json
+import os
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from . import index
+
+BLOCKS = ("main", "data", "method")
+
+def _encode(frame):
+    """Returns frame with the columns that Arrow can not store, e.g.
+    categoricals with both integer and string categories, replaced by
+    their integer codes, and the values needed to decode them."""
+    columns = {}
+    encoded = {}
+    for col, dtype in frame.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = frame[col].cat.categories
+            codes = frame[col].cat.codes
+        elif dtype == object:
+            values = None
+            codes = None
+        else:
+            continue
+        try:
+            pa.array(values if values is not None else frame[col], from_pandas=True)
+            continue
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        if codes is None:
+            codes, values = pd.factorize(frame[col])
+        columns[col] = codes
+        encoded[col] = {"values": [value.item() if isinstance(value, np.generic) else value for value in values],
+                        "categorical": isinstance(dtype, pd.CategoricalDtype)}
+    return frame.assign(**columns) if columns else frame, encoded
+
+def _decode(frame, encoded):
+    columns = {}
+    for col, info in encoded.items():
+        codes = frame[col].to_numpy()
+        if info["categorical"]:
+            columns[col] = pd.Categorical.from_codes(codes, categories=pd.Index(info["values"], dtype=object))
+        else:
+            values = np.array(info["values"] + [np.nan], dtype=object)
+            columns[col] = values[codes]
+    return frame.assign(**columns) if columns else frame
+
+def write_block(frame, path, id_col="investigation_point", row_group_size=65536):
+    """Writes a block as a parquet file, with the rows grouped by
+    id_col, and each row group holding whole boreholes. Categorical
+    columns are stored dictionary encoded; so are string columns,
+    by the parquet writer."""
+    if id_col in frame.columns:
+        groups = index.GroupIndex(frame[id_col])
+        frame = groups.sort(frame)
+        bounds = np.concatenate(([0], groups.starts, [len(frame)]))
+    else:
+        bounds = np.append(np.arange(0, len(frame), row_group_size), len(frame))
+    # Each row group ends at the first borehole boundary at or after
+    # row_group_size rows
+    bounds = np.unique(bounds)
+    splits = np.unique(np.append(bounds[np.searchsorted(bounds, np.arange(0, len(frame), row_group_size))], len(frame)))
+    frame, encoded = _encode(frame.reset_index(drop=True))
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata(dict(
+        table.schema.metadata or {},
+        libsgfdata=json.dumps({"id_col": id_col, "encoded": encoded})))
+    with pq.ParquetWriter(path, table.schema) as writer:
+        for start, stop in zip(splits[:-1], splits[1:]):
+            writer.write_table(table.slice(start, stop - start), row_group_size=stop - start)
+        if len(splits) < 2:
+            writer.write_table(table)
+
+def read_block(path, ids=None, columns=None):
+    """Reads a block written by write_block(). If ids is given, only
+    the rows of the boreholes with those ids are read, skipping row
+    groups that can not contain them."""
+    schema = pq.read_schema(path)
+    info = json.loads(schema.metadata[b"libsgfdata"])
+    filters = None
+    if ids is not None and info["id_col"] in schema.names:
+        filters = [(info["id_col"], "in", list(ids))]
+    table = pq.read_table(path, columns=columns, filters=filters)
+    frame = table.to_pandas()
+    # Arrow nulls are read back as None in object columns, while the
+    # parser uses NaN for missing values
+    frame = frame.assign(**{col: frame[col].where(frame[col].notna(), np.nan)
+                            for col, dtype in frame.dtypes.items() if dtype == object})
+    return _decode(frame, {col: value for col, value in info["encoded"].items() if col in frame.columns})
+
+def write(model_dict, path, id_col="investigation_point", row_group_size=65536):
+    """Writes a model dict (see SGFData.model_dict) to the directory
+    path, as one parquet file per block."""
+    os.makedirs(path, exist_ok=True)
+    for name, block in model_dict.items():
+        if block is not None:
+            write_block(block, os.path.join(path, name + ".parquet"), id_col=id_col, row_group_size=row_group_size)
+
+def read(path, ids=None):
+    """Reads a model dict written by write(), optionally only the
+    boreholes with the given ids. Returns (model_dict, id_col)."""
+    model_dict = {}
+    id_col = "investigation_point"
+    for name in BLOCKS:
+        filename = os.path.join(path, name + ".parquet")
+        if os.path.exists(filename):
+            id_col = json.loads(pq.read_schema(filename).metadata[b"libsgfdata"])["id_col"]
+            model_dict[name] = read_block(filename, ids=ids)
+    return model_dict, id_col
+
+def parse(input_filename):
+    """Parser entry point: reads a directory written by dump(), and
+    returns a list of sections, like libsgfdata.parser.parse()."""
+    from . import geotech_set_to_sections
+    model_dict, id_col = read(input_filename)
+    return geotech_set_to_sections(model_dict, id_col=id_col)
+
+def dump(sections, output_filename, id_col="investigation_point"):
+    """Dumper entry point: writes a list of sections, as returned by
+    parse(), to the directory output_filename."""
+    from . import sections_to_geotech_set
+    write(sections_to_geotech_set(sections, id_col=id_col), output_filename, id_col=id_col)
@@ -10,9 +10,13 @@ import datetime
 import logging
 from pathlib import Path
 import sys
+import array
+import collections
+import mmap
 from  charset_normalizer import detect
 from . import normalizer
 from . import metadata
+from . import dtypes
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,7 @@ _RE_INT = re.compile(r"^\s*[-+]?[0-9]+\s*$")
 # have date fields (key "%") with no "=" separating the key from the
 # value...
 _RE_FIELD_SEP = re.compile(r",(?:(?=[a-zA-Z])|(?=%))")
+_RE_FIELD_SEP_BYTES = re.compile(_RE_FIELD_SEP.pattern.encode("ascii"))
 
 def _conv(b, k, v):
     conv = metadata.block_metadata[b].conv.get(k, np.nan)
@@ -37,54 +42,380 @@ def _conv(b, k, v):
         return float(v)
     return v
 
-def _parse_line(block, line):
+# Characters that can make up a number matched by _RE_INT or
+# _RE_FLOAT, once surrounding whitespace has been stripped.
+_NUMBER_CHARS = "0123456789.+-eE"
+
+def _conv_untyped(v):
+    """Same as _conv() for a code without a converter, but without
+    the regular expression matches: Only strings consisting of
+    _NUMBER_CHARS can match _RE_INT or _RE_FLOAT, and for those,
+    int() and float() accept exactly the same strings as the regular
+    expressions do."""
+    s = v.strip()
+    if s and not s.strip(_NUMBER_CHARS):
+        try:
+            if "." in s or "e" in s or "E" in s:
+                return float(s)
+            return int(s)
+        except ValueError:
+            pass
+    return v
+
+def _make_conversion_plan(b):
+    """Maps each SGF code of block b that has a converter in
+    metadata.block_metadata to that converter."""
+    conv = metadata.block_metadata[b].conv
+    return {k: c for k, c in conv.items() if c is not np.nan}
+
+_conversion_plans = {b: _make_conversion_plan(b) for b in metadata.block_metadata}
+
+def _keep(v):
+    return v
+
+# Codes whose values are converted a whole column at a time, when
+# collected by a _ColumnarBlock. Their values are kept as is while
+# parsing.
+_column_conversions = {
+    b: {k: c for k, c in metadata.block_metadata[b].colconv.items() if c is not np.nan}
+    for b in metadata.block_metadata}
+_columnar_conversion_plans = {
+    b: dict(plan, **{k: _keep for k in _column_conversions[b]})
+    for b, plan in _conversion_plans.items()}
+
+def _split_fields(line):
+    line = line.rstrip(',')
+    return (i.split("=", 1) if "=" in i else [i[0], i[1:]]
+            for i in re.split(_RE_FIELD_SEP, line) if i)
+
+def _split_fields_bytes(line, encoding, keys):
+    """Like _split_fields(), but for an undecoded line in an ASCII
+    compatible encoding. Only keys and values are decoded, and keys
+    are looked up in (and added to) the cache keys."""
+    line = line.rstrip(b',')
+    for i in re.split(_RE_FIELD_SEP_BYTES, line):
+        if b"=" in i:
+            k, v = i.split(b"=", 1)
+            key = keys.get(k)
+            if key is None:
+                key = keys[k] = k.decode(encoding, errors='ignore')
+            yield key, v.decode(encoding, errors='ignore')
+        else:
+            i = i.decode(encoding, errors='ignore')
+            if i:
+                yield i[0], i[1:]
+
+def _parse_line(block, line, split=_split_fields):
     try:
         if not line.strip():
             return {}
-        line = line.rstrip(',')
-        return {k:_conv(block, k, v)
-                for k, v in (i.split("=", 1) if "=" in i else [i[0], i[1:]]
-                             for i in re.split(_RE_FIELD_SEP, line) if i)}
+        plan = _conversion_plans[block]
+        return {k:plan.get(k, _conv_untyped)(v)
+                for k, v in split(line)}
     except Exception as e:
         raise Exception("%s: %s" % (e, line))
 
-def _parse_raw(input_filename, *arg, **kw):
-    if isinstance(input_filename, str):
-        with open(input_filename, "rb") as f:
-            return _parse_raw_from_file(f, *arg, **kw)
-    else:
-        return _parse_raw_from_file(input_filename, *arg, **kw)
+# Python types that can be stored in a typed array.array column
+# buffer, and the other way around.
+_BUFFER_TYPECODES = {float: "d", int: "q"}
+_BUFFER_TYPES = {"d": float, "q": int}
 
-    
-def _parse_raw_from_file(f, encoding=None):
-    if encoding is None:
-        sample = f.read(4096)
+class _ColumnarBlock(object):
+    """Accumulates the rows of a block column by column, keyed by SGF
+    code, instead of as a list of dicts.
+
+    Columns holding only floats or only ints are kept in typed
+    array.array buffers, and handed to numpy without copying when the
+    DataFrame is built. Any other column is kept as a plain list.
+    Missing values are filled with NaN. The resulting DataFrame is
+    identical to pd.DataFrame() of the corresponding list of dicts.
+
+    conversions maps codes to functions converting a whole column
+    (list) of raw values, see metadata.typemap.colconv.
+    """
+    def __init__(self, conversions=None):
+        self.conversions = conversions or {}
+        self.columns = {}
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def _new_column(self, value):
+        typecode = _BUFFER_TYPECODES.get(type(value))
+        if typecode == "d" or (typecode is not None and not self.length):
+            return array.array(typecode, [np.nan] * self.length)
+        return [np.nan] * self.length
+
+    def _set(self, key, value):
+        """Appends value to the column for key, and returns whether
+        key is new on the current line."""
+        new = True
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = self._new_column(value)
+        elif len(column) > self.length:
+            # Duplicate key on a single line, the last value wins
+            column.pop()
+            new = False
+        if type(column) is not list and type(value) is not _BUFFER_TYPES[column.typecode]:
+            column = self.columns[key] = column.tolist()
+        try:
+            column.append(value)
+        except OverflowError:
+            column = self.columns[key] = column.tolist()
+            column.append(value)
+        return new
+
+    def append(self, fields):
+        count = 0
+        for key, value in fields:
+            count += self._set(key, value)
+        self.length += 1
+        if count != len(self.columns):
+            for key, column in self.columns.items():
+                if len(column) < self.length:
+                    self._set(key, np.nan)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            key: (self.conversions[key](column) if key in self.conversions
+                  else np.frombuffer(column, dtype=column.typecode) if type(column) is not list
+                  else column)
+            for key, column in self.columns.items()})
+
+def _parse_columnar_line(block, columnar, line, split=_split_fields):
+    try:
+        plan = _columnar_conversion_plans[block]
+        columnar.append((k, plan.get(k, _conv_untyped)(v))
+                        for k, v in split(line))
+    except Exception as e:
+        raise Exception("%s: %s" % (e, line))
+
+_ASCII_BYTES = bytes(range(128))
+
+class EncodingDetector(object):
+    """Detects the encoding of a batch of files from a sample of
+    their first bytes.
+
+    Samples that are pure ASCII or valid UTF-8 are accepted
+    immediately. Other samples are run through charset_normalizer,
+    and the result is cached, keyed by the set of non-ASCII bytes in
+    the sample, so that files of the batch from the same source are
+    only detected once. At most cache_size results are kept. With
+    per_batch=True, the first detection result is reused for all
+    subsequent files that are neither ASCII nor UTF-8.
+
+    The cache lives as long as the detector, so create one per batch
+    of files from the same source, and pass it as the encoding; by
+    default, each file gets a detector of its own, except in
+    parse_many(), which uses one per call.
+
+    stats counts how often each of these paths was taken.
+    """
+    def __init__(self, per_batch=False, cache_size=256):
+        self.per_batch = per_batch
+        self.cache_size = cache_size
+        self.cache = {}
+        self.stats = collections.Counter()
+
+    def detect(self, sample):
+        if not sample.translate(None, _ASCII_BYTES):
+            self.stats["ascii"] += 1
+            return "ascii"
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        except UnicodeDecodeError:
+            pass
+        else:
+            self.stats["utf-8"] += 1
+            return "utf-8"
+        key = None if self.per_batch else bytes(sorted(set(sample.translate(None, _ASCII_BYTES))))
+        if key in self.cache:
+            self.stats["batch" if self.per_batch else "cached"] += 1
+            return self.cache[key]
+        self.stats["detected"] += 1
         detection = detect(sample)
         if detection["confidence"] < 0.85:
             encoding = 'latin-1'
         else:
             encoding = detection["encoding"]
+        if len(self.cache) >= self.cache_size:
+            del self.cache[next(iter(self.cache))]
+        self.cache[key] = encoding
+        return encoding
+
+def _parse_raw(*arg, **kw):
+    return list(_iter_raw(*arg, **kw))
+
+def _iter_raw(input_filename, *arg, engine="text", **kw):
+    iter_raw_from_file = _engines[engine]
+    if isinstance(input_filename, str):
+        with open(input_filename, "rb") as f:
+            yield from iter_raw_from_file(f, *arg, **kw)
+    else:
+        yield from iter_raw_from_file(input_filename, *arg, **kw)
+
+    
+def _parse_raw_from_file(*arg, **kw):
+    return list(_iter_raw_from_file(*arg, **kw))
+
+# Raw block markers for each block name, for the blocks argument
+_block_markers = {"main": ("$",), "method": ("£", "€"), "data": ("#",)}
+
+def _markers(blocks):
+    if blocks is None:
+        return None
+    unknown = set(blocks) - set(_block_markers)
+    if unknown:
+        raise ValueError("Unknown blocks: %s" % ", ".join(sorted(unknown)))
+    return {marker for name in blocks for marker in _block_markers[name]}
+
+def _iter_raw_from_file(f, encoding=None, columnar=True, blocks=None):
+    """Yields the raw blocks of one section at a time, as soon as the
+    next main block header ("$") or the end of the file is seen.
+
+    If blocks is given, only the lines of those blocks ("main",
+    "method", "data") are parsed; other lines are skipped."""
+    markers = _markers(blocks)
+    if encoding is None:
+        encoding = EncodingDetector()
+    if isinstance(encoding, EncodingDetector):
+        encoding = encoding.detect(f.read(4096))
         f.seek(0)
 
     f = codecs.getreader(encoding)(f, errors='ignore')
-    sections = []
-    blocks = None
+    section = None
     block = None
     for row in f:
         row = row.rstrip()
         if not row:
             continue
         if row == "$":
-            blocks = {"£":[], "$":[], "#":[], "€": []}
-            sections.append(blocks)
+            if section is not None:
+                yield section
+            section = {"£":[], "$":[], "#":_ColumnarBlock(_column_conversions["data"]) if columnar else [], "€": []}
         if row in ("£", "$", "#", "€", "#$"):
             block = row
         else:
-            if blocks is None:
+            if section is None:
                 raise ValueError("First block is not a main block")
-            if block in blocks:
-                blocks[block].append(_parse_line(metadata.blocknames[block], row))
-    return sections
+            if block in section and (markers is None or block in markers):
+                if isinstance(section[block], _ColumnarBlock):
+                    _parse_columnar_line(metadata.blocknames[block], section[block], row)
+                else:
+                    section[block].append(_parse_line(metadata.blocknames[block], row))
+    if section is not None:
+        yield section
+
+def _is_single_byte(encoding):
+    """Whether every character of encoding is a single byte, and the
+    markers and separators are encoded as in ASCII, so that files can
+    be split into lines and fields as bytes."""
+    if "$#,=\n".encode(encoding) != b"$#,=\n":
+        return False
+    # Multi-byte decoders, e.g. for UTF-8, hold back the lead bytes
+    # of multi-byte characters
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    return all(len(decoder.decode(bytes([c]))) == 1 for c in range(256))
+
+def _iter_raw_from_mmap(f, encoding=None, columnar=True, blocks=None):
+    """Like _iter_raw_from_file(), but memory maps the file (if
+    possible) and tokenizes it as bytes, decoding only the keys and
+    values of the fields of blocks that are actually used.
+
+    Skipped blocks are not even split into lines; instead, the byte
+    offsets (start, stop) of each skipped data block are listed in
+    the "data_offsets" of its section, see load_data().
+
+    Files in encodings with multi-byte characters, e.g. UTF-8, whose
+    whitespace and line breaks can not be found byte by byte, are read
+    with _iter_raw_from_file() instead."""
+    if encoding is None:
+        encoding = EncodingDetector()
+    if isinstance(encoding, EncodingDetector):
+        encoding = encoding.detect(f.read(4096))
+        f.seek(0)
+    if not _is_single_byte(encoding):
+        yield from _iter_raw_from_file(f, encoding, columnar, blocks)
+        return
+
+    try:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        # Not a real file, or an empty one
+        buf = f.read()
+    try:
+        yield from _iter_raw_from_buffer(buf, encoding, columnar, blocks)
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+def _iter_raw_from_buffer(buf, encoding, columnar=True, blocks=None):
+    # Line breaks and trailing whitespace are the bytes that
+    # str.splitlines() and str.rstrip() would split on / strip when
+    # decoded, so that lines come out the same as for
+    # _iter_raw_from_file(). This only holds for single byte
+    # encodings, see _is_single_byte().
+    chars = [bytes([c]).decode(encoding, errors='ignore') for c in range(256)]
+    linebreaks = bytes(c for c, char in enumerate(chars) if char.splitlines() == [""])
+    whitespace = bytes(c for c, char in enumerate(chars) if char.isspace())
+    re_line = re.compile(b"[^" + re.escape(linebreaks) + b"]+")
+    markers = {}
+    for marker in ("£", "$", "#", "€", "#$"):
+        try:
+            markers[marker.encode(encoding)] = marker
+        except UnicodeEncodeError:
+            pass
+    keys = {}
+    def split(line):
+        return _split_fields_bytes(line, encoding, keys)
+
+    # Matches the next marker line, to skip over blocks that are not
+    # parsed without looking at their lines
+    keep = _markers(blocks)
+    re_marker = re.compile(
+        b"(?<![^" + re.escape(linebreaks) + b"])"
+        + b"(?:" + b"|".join(re.escape(marker) for marker in sorted(markers, key=len, reverse=True)) + b")"
+        + b"[" + re.escape(bytes(c for c in whitespace if c not in linebreaks)) + b"]*"
+        + b"(?![^" + re.escape(linebreaks) + b"])")
+
+    section = None
+    block = None
+    pos = 0
+    while pos is not None:
+        for match in re_line.finditer(buf, pos):
+            row = match.group().rstrip(whitespace)
+            if not row:
+                continue
+            marker = markers.get(row)
+            if marker == "$":
+                if section is not None:
+                    yield section
+                section = {"£":[], "$":[], "#":_ColumnarBlock(_column_conversions["data"]) if columnar else [], "€": []}
+            if marker is not None:
+                block = marker
+                if keep is not None and marker not in keep:
+                    next_marker = re_marker.search(buf, match.end())
+                    pos = next_marker.start() if next_marker else None
+                    if marker == "#":
+                        section.setdefault("data_offsets", []).append(
+                            (match.end(), pos if pos is not None else len(buf)))
+                    break
+            else:
+                if section is None:
+                    raise ValueError("First block is not a main block")
+                if block in section:
+                    if isinstance(section[block], _ColumnarBlock):
+                        _parse_columnar_line(metadata.blocknames[block], section[block], row, split)
+                    else:
+                        section[block].append(_parse_line(metadata.blocknames[block], row, split))
+        else:
+            pos = None
+    if section is not None:
+        yield section
+
+_engines = {"text": _iter_raw_from_file, "mmap": _iter_raw_from_mmap}
 
 def _rename_blocks(sections):
     for idx in range(len(sections)):
@@ -94,27 +425,29 @@ def _rename_blocks(sections):
 def _make_dfs(sections):
     for idx in range(len(sections)):
         if "data" in sections[idx]:
-            if sections[idx]["data"]:
-                sections[idx]["data"] = pd.DataFrame(sections[idx]["data"])
-            else:
+            if not len(sections[idx]["data"]):
                 del sections[idx]["data"]
+            elif isinstance(sections[idx]["data"], _ColumnarBlock):
+                sections[idx]["data"] = sections[idx]["data"].to_frame()
+            else:
+                sections[idx]["data"] = pd.DataFrame(sections[idx]["data"])
 
 def _rename_data_columns(sections):
     for idx in range(len(sections)):
         if "data" in sections[idx]:
-            sections[idx]["data"] = sections[idx]["data"].rename(columns = metadata.data.ident.to_dict())
+            sections[idx]["data"] = sections[idx]["data"].rename(columns = metadata.data_idents)
 
 def _rename_main(sections):
     for idx in range(len(sections)):
         sections[idx]["main"] = [
-            {metadata.main.loc[key, "ident"] if key in metadata.main.index else key: value
+            {metadata.main_idents.get(key, key): value
              for key, value in row.items()}
             for row in sections[idx]["main"]]
 
 def _rename_method(sections):
     for idx in range(len(sections)):
         sections[idx]["method"] = [
-            {metadata.method.loc[key, "ident"] if key in metadata.method.index else key: value
+            {metadata.method_idents.get(key, key): value
              for key, value in row.items()}
             for row in sections[idx]["method"]]
         
@@ -123,8 +456,8 @@ def _rename_values_method_code(sections):
         for row in section["main"]:
             if 'method_code' in row:
                 code = str(row['method_code'])
-                if code in metadata.methods.index:
-                    row['method_code'] = metadata.methods.loc[code, "ident"]
+                if code in metadata.methods_idents:
+                    row['method_code'] = metadata.methods_idents[code]
 
 def _rename_values_comments(sections):
     for section in sections:
@@ -135,24 +468,18 @@ def _rename_values_comments(sections):
                 except:
                     return x
             codes = section["data"].comments.fillna(-1).apply(convert)
-            missing = list(set(codes.unique()) - set(metadata.comments.index))
-            labels = pd.concat((metadata.comments,
-                                pd.DataFrame([{"ident": code} for code in missing], index=missing)))
-            section["data"]["comments"] = labels.loc[codes, "ident"].values
+            section["data"]["comments"] = metadata.categorical(
+                codes, metadata.comments_categories, metadata.comments_idents)
 
 def _rename_values_data_flags(sections):
     key = "allocated_value_during_performance_of_sounding"
     for section in sections:
         if "data" in section and key in section["data"].columns:
             codes = section["data"][key].fillna(-1).astype(int)
-            missing = list(set(codes.unique()) - set(metadata.data_flags.index))
-            labels = pd.concat((metadata.data_flags,
-                                pd.DataFrame([{"ident": code} for code in missing], index=missing)))
-            section["data"][key] = labels.loc[codes, "ident"].values
+            section["data"][key] = metadata.categorical(
+                codes, metadata.data_flags_categories, metadata.data_flags_idents)
             
-def parse(*arg, **kw):
-    assert not kw.pop("normalize", False), "Normalization is now only supported by SGFData wrapper objects."
-    sections = _parse_raw(*arg, **kw)
+def _rename(sections):
     _rename_blocks(sections)
     _rename_main(sections)
     _rename_values_method_code(sections)
@@ -161,4 +488,53 @@ def parse(*arg, **kw):
     _rename_data_columns(sections)
     _rename_values_comments(sections)
     _rename_values_data_flags(sections)
-    return sections
+
+def iter_sections(*arg, **kw):
+    """Like parse(), but yields one fully renamed and typed section
+    (borehole) at a time, so that memory use is bounded by the
+    largest single section rather than by the size of the file."""
+    assert not kw.pop("normalize", False), "Normalization is now only supported by SGFData wrapper objects."
+    dtype_policy = kw.pop("dtype_policy", None)
+    for section in _iter_raw(*arg, **kw):
+        sections = [section]
+        _rename(sections)
+        if "data" in sections[0]:
+            sections[0]["data"], _ = dtypes.apply_policy(sections[0]["data"], dtype_policy)
+        yield sections[0]
+
+def parse(*arg, **kw):
+    return list(iter_sections(*arg, **kw))
+
+def scan_headers(*arg, **kw):
+    """Like parse(), but only parses the main and method blocks. Data
+    lines are skipped over without being split or converted; instead
+    each section gets a "data_offsets" list of the (start, stop) byte
+    offsets of its data, that can be loaded later with load_data().
+
+    Uses the mmap engine by default, as the text engine can not skip
+    lines without reading them, nor give byte offsets."""
+    kw.setdefault("engine", "mmap")
+    return parse(*arg, blocks=("main", "method"), **kw)
+
+def load_data(input_filename, section, encoding=None):
+    """Loads the data block of a section returned by scan_headers()
+    from the same file, as a DataFrame. Raises a ValueError for
+    sections without data offsets, e.g. scanned with the text engine."""
+    if "data_offsets" not in section:
+        raise ValueError("Section has no data offsets; scan it with scan_headers(engine=\"mmap\")")
+    if isinstance(input_filename, str):
+        with open(input_filename, "rb") as f:
+            return load_data(f, section, encoding)
+    f = input_filename
+    if encoding is None:
+        encoding = EncodingDetector()
+    if isinstance(encoding, EncodingDetector):
+        f.seek(0)
+        encoding = encoding.detect(f.read(4096))
+    chunks = []
+    for start, stop in section["data_offsets"]:
+        f.seek(start)
+        chunks.append(f.read(stop - start))
+    sections = list(_iter_raw_from_buffer("$\n#\n".encode(encoding) + b"\n".join(chunks), encoding))
+    _rename(sections)
+    return sections[0].get("data", pd.DataFrame())
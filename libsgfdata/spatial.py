@@ -0,0 +1,157 @@
+import heapq
+import numpy as np
+
+class KDTree(object):
+    """A static 2d KD-tree over point coordinates, in plain numpy.
+
+    Points with a missing coordinate are left out. All queries return
+    positions into the x and y arrays the tree was built from."""
+    def __init__(self, x, y, leafsize=16):
+        points = np.column_stack((np.asarray(x, dtype=float), np.asarray(y, dtype=float)))
+        self.index = np.flatnonzero(np.isfinite(points).all(axis=1))
+        self.points = points[self.index]
+        self.leafsize = leafsize
+        # Nodes are stored in flat lists; node i covers
+        # self.points[lo[i]:hi[i]], and has children left[i] and
+        # right[i], or -1 for leaves.
+        self.lo = []
+        self.hi = []
+        self.left = []
+        self.right = []
+        self.mins = []
+        self.maxs = []
+        if len(self.points):
+            self._build(0, len(self.points))
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, lo, hi):
+        node = len(self.lo)
+        points = self.points[lo:hi]
+        mins, maxs = points.min(axis=0), points.max(axis=0)
+        self.lo.append(lo)
+        self.hi.append(hi)
+        self.mins.append(mins)
+        self.maxs.append(maxs)
+        self.left.append(-1)
+        self.right.append(-1)
+        if hi - lo > self.leafsize:
+            axis = int(np.argmax(maxs - mins))
+            mid = (hi - lo) // 2
+            order = np.argpartition(points[:, axis], mid)
+            self.points[lo:hi] = points[order]
+            self.index[lo:hi] = self.index[lo:hi][order]
+            self.left[node] = self._build(lo, lo + mid)
+            self.right[node] = self._build(lo + mid, hi)
+        return node
+
+    def _mindist2(self, node, x, y):
+        dx = max(self.mins[node][0] - x, 0.0, x - self.maxs[node][0])
+        dy = max(self.mins[node][1] - y, 0.0, y - self.maxs[node][1])
+        return dx * dx + dy * dy
+
+    def within_bbox(self, xmin, ymin, xmax, ymax):
+        """Returns the positions of all points with xmin <= x <= xmax
+        and ymin <= y <= ymax, in ascending order."""
+        res = []
+        stack = [0] if len(self) else []
+        while stack:
+            node = stack.pop()
+            mins, maxs = self.mins[node], self.maxs[node]
+            if mins[0] > xmax or maxs[0] < xmin or mins[1] > ymax or maxs[1] < ymin:
+                continue
+            lo, hi = self.lo[node], self.hi[node]
+            if mins[0] >= xmin and maxs[0] <= xmax and mins[1] >= ymin and maxs[1] <= ymax:
+                res.append(self.index[lo:hi])
+            elif self.left[node] < 0:
+                points = self.points[lo:hi]
+                filt = ((points[:, 0] >= xmin) & (points[:, 0] <= xmax)
+                        & (points[:, 1] >= ymin) & (points[:, 1] <= ymax))
+                res.append(self.index[lo:hi][filt])
+            else:
+                stack.extend((self.left[node], self.right[node]))
+        return np.sort(np.concatenate(res)) if res else np.zeros(0, dtype=int)
+
+    def within_radius(self, x, y, radius):
+        """Returns the positions of all points within radius of
+        (x, y), in ascending order."""
+        radius2 = radius * radius
+        res = []
+        stack = [0] if len(self) else []
+        while stack:
+            node = stack.pop()
+            if self._mindist2(node, x, y) > radius2:
+                continue
+            if self.left[node] < 0:
+                lo, hi = self.lo[node], self.hi[node]
+                points = self.points[lo:hi]
+                dist2 = (points[:, 0] - x) ** 2 + (points[:, 1] - y) ** 2
+                res.append(self.index[lo:hi][dist2 <= radius2])
+            else:
+                stack.extend((self.left[node], self.right[node]))
+        return np.sort(np.concatenate(res)) if res else np.zeros(0, dtype=int)
+
+    def nearest(self, x, y, k=1):
+        """Returns the distances to and positions of the k points
+        nearest to (x, y), nearest first."""
+        # best is a max-heap (by negated distance) of the k nearest
+        # points found so far; nodes are visited nearest first, and
+        # the search stops when no node can contain a nearer point.
+        best = []
+        nodes = [(0.0, 0)] if len(self) and k > 0 else []
+        while nodes:
+            dist2, node = heapq.heappop(nodes)
+            if len(best) == k and dist2 > -best[0][0]:
+                break
+            if self.left[node] < 0:
+                lo, hi = self.lo[node], self.hi[node]
+                points = self.points[lo:hi]
+                dists2 = (points[:, 0] - x) ** 2 + (points[:, 1] - y) ** 2
+                for pos in np.argsort(dists2, kind="stable")[:k]:
+                    item = (-dists2[pos], -(lo + pos))
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+                    else:
+                        break
+            else:
+                for child in (self.left[node], self.right[node]):
+                    heapq.heappush(nodes, (self._mindist2(child, x, y), child))
+        best = sorted(best, reverse=True)
+        return (np.sqrt([-dist2 for dist2, pos in best]),
+                self.index[[-pos for dist2, pos in best]].astype(int))
+
+def _cross(p, q, points):
+    return (q[0] - p[0]) * (points[:, 1] - p[1]) - (q[1] - p[1]) * (points[:, 0] - p[0])
+
+def _hull_chain(points, p, q):
+    """Returns the hull vertices from p to q (exclusive), given the
+    points strictly to the right of the line from p to q."""
+    if not len(points):
+        return []
+    far = points[_cross(p, q, points).argmin()]
+    return (_hull_chain(points[_cross(p, far, points) < 0], p, far)
+            + [far]
+            + _hull_chain(points[_cross(far, q, points) < 0], far, q))
+
+def convex_hull(x, y):
+    """Returns the vertices of the convex hull of the points (x, y)
+    as an (n, 2) array in counter-clockwise order, using quickhull
+    with each partitioning step vectorized. Points with a missing
+    coordinate are ignored. For fewer than three distinct or only
+    collinear points, the one or two extreme points are returned."""
+    points = np.column_stack((np.asarray(x, dtype=float), np.asarray(y, dtype=float)))
+    points = points[np.isfinite(points).all(axis=1)]
+    if not len(points):
+        return points
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    first, last = points[order[0]], points[order[-1]]
+    if (first == last).all():
+        return points[order[:1]]
+    side = _cross(first, last, points)
+    return np.array([first]
+                    + _hull_chain(points[side < 0], first, last)
+                    + [last]
+                    + _hull_chain(points[side > 0], last, first))
@@ -20,7 +20,7 @@ setuptools.setup(
     package_data={'libsgfdata': ['*/*.csv']},
     install_requires=[
         "numpy",
-        "pandas",
+        "pandas>=3",
         "python-slugify",
         "python-dateutil",
         "charset-normalizer"
@@ -35,11 +35,16 @@ setuptools.setup(
             "geopandas",
             "terrainy"
         ],
+        "parquet": [
+            "pyarrow"
+        ],
     },
 
     entry_points = {
-        'libsgfdata.parsers': ['sgf=libsgfdata.parser:parse'],
-        'libsgfdata.dumpers': ['sgf=libsgfdata.dumper:dump'],
+        'libsgfdata.parsers': ['sgf=libsgfdata.parser:parse',
+                               'parquet=libsgfdata.parquet:parse'],
+        'libsgfdata.dumpers': ['sgf=libsgfdata.dumper:dump',
+                               'parquet=libsgfdata.parquet:dump'],
         'libsgfdata.transforms': ['sample_dtm=libsgfdata.cmd_dtm:sample_dtm',
                                   'normalize=libsgfdata.cmd_normalize:cmd_normalize',
                                   'depth=libsgfdata.cmd_depth:cmd_depth',
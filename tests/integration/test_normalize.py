@@ -0,0 +1,26 @@
+import os.path
+import pandas as pd
+
+import libsgfdata as sgf
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "examples", "data")
+
+class TestNormalize:
+    def test_copy_leaves_original_unchanged(self):
+        orig = sgf.SGFData(os.path.join(basepath, "1059.cpt"))
+        before = orig.copy()
+        normalized = orig.normalize(sort=True)
+        for block in ("main", "data", "method"):
+            pd.testing.assert_frame_equal(getattr(orig, block), getattr(before, block))
+        assert "depth_max_drilled" in normalized.main.columns
+        assert "depth_max_drilled" not in orig.main.columns
+
+    def test_inplace(self):
+        path = os.path.join(basepath, "1059.cpt")
+        normalized = sgf.SGFData(path).normalize()
+        data = sgf.SGFData(path)
+        sections = data.sections
+        assert data.normalize(inplace=True) is None
+        assert data.sections is not sections
+        for block in ("main", "data", "method"):
+            pd.testing.assert_frame_equal(getattr(data, block), getattr(normalized, block))
@@ -0,0 +1,38 @@
+import os.path
+import pytest
+import pandas as pd
+
+import libsgfdata
+
+pytest.importorskip("pyarrow")
+from libsgfdata import parquet
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "examples", "data")
+
+class TestParquet:
+    def test_write_read(self, tmp_path):
+        orig = libsgfdata.SGFData(*[libsgfdata.SGFData(os.path.join(basepath, name))
+                                    for name in sorted(os.listdir(basepath))])
+        orig.to_parquet(str(tmp_path / "archive"))
+        reread = libsgfdata.SGFData.from_parquet(str(tmp_path / "archive"))
+        assert reread.id_col == orig.id_col
+        for name, block in orig.model_dict.items():
+            pd.testing.assert_frame_equal(reread.model_dict[name], block)
+
+    def test_row_groups(self, tmp_path):
+        import pyarrow.parquet as pq
+        ids = ["a"] * 3 + ["b"] * 2 + ["c"] * 4 + ["d"]
+        data = pd.DataFrame({"investigation_point": ids, "depth": range(len(ids))})
+        parquet.write_block(data, str(tmp_path / "data.parquet"), row_group_size=4)
+        metadata = pq.ParquetFile(str(tmp_path / "data.parquet")).metadata
+        assert [metadata.row_group(idx).num_rows for idx in range(metadata.num_row_groups)] == [5, 4, 1]
+        res = parquet.read_block(str(tmp_path / "data.parquet"), ids=["b", "d"])
+        assert list(res.depth) == [3, 4, 9]
+
+    def test_entry_points(self, tmp_path):
+        sections = libsgfdata.parse(os.path.join(basepath, "1-CPT.std"))
+        parquet.dump(sections, str(tmp_path / "archive"))
+        reread = parquet.parse(str(tmp_path / "archive"))
+        expected = libsgfdata.SGFData(sections).sections
+        assert len(reread) == len(expected)
+        pd.testing.assert_frame_equal(reread[0]["data"], expected[0]["data"])
@@ -1,6 +1,8 @@
 import datetime
+import io
 import os.path
 import pytest
+import pandas as pd
 
 import libsgfdata as sgf
 
@@ -11,16 +13,16 @@ class TestParse:
         for name in os.listdir(basepath):
             d = sgf.parse(os.path.join(basepath, name))
 
-    def test_write(self):
+    def test_write(self, tmp_path):
         for name in os.listdir(basepath):
             d = sgf.parse(os.path.join(basepath, name))
-            sgf.dump(d, "tmp.sgf")
+            sgf.dump(d, str(tmp_path / "tmp.sgf"))
 
-    def test_write_read(self):
+    def test_write_read(self, tmp_path):
         for name in os.listdir(basepath):
             orig = sgf.parse(os.path.join(basepath, name))
-            sgf.dump(orig, "tmp.sgf")
-            reread = sgf.parse("tmp.sgf")
+            sgf.dump(orig, str(tmp_path / "tmp.sgf"))
+            reread = sgf.parse(str(tmp_path / "tmp.sgf"))
             assert len(reread) == len(orig)
             for idx, (orig_section, reread_section) in enumerate(zip(orig, reread)):
                 assert list(orig_section.keys()) == list(reread_section.keys()), "%s: %s" % (name, idx)
@@ -32,3 +34,112 @@ class TestParse:
                         assert set(orig_block.columns) == set(reread_block.columns), "%s: %s: %s" % (name, idx, blockname)
                     elif hasattr(orig_block, "keys"):
                         assert list(orig_block.keys()) == list(reread_block.keys()), "%s: %s: %s" % (name, idx, blockname)
+
+    def test_iter_sections(self, tmp_path):
+        names = sorted(name for name in os.listdir(basepath) if name != "two_lines_header.cpt")
+        path = str(tmp_path / "multi.sgf")
+        with open(path, "wb") as f:
+            for name in names:
+                with open(os.path.join(basepath, name), "rb") as g:
+                    f.write(g.read().rstrip(b"\r\n,") + b"\n")
+        sections = sgf.iter_sections(path)
+        assert not isinstance(sections, list)
+        sections = list(sections)
+        assert len(sections) == len(names) == len(sgf.parse(path))
+        data = sgf.SGFData.from_sections(sgf.iter_sections(path))
+        assert data.main.investigation_point.nunique() == len(names)
+        assert len(data.data) == sum(len(section["data"]) for section in sections)
+
+    def test_mmap_engine(self):
+        for name in os.listdir(basepath):
+            text = sgf.parse(os.path.join(basepath, name))
+            mmapped = sgf.parse(os.path.join(basepath, name), engine="mmap")
+            assert len(text) == len(mmapped)
+            for text_section, mmapped_section in zip(text, mmapped):
+                assert text_section.keys() == mmapped_section.keys()
+                assert repr(text_section["main"]) == repr(mmapped_section["main"])
+                if "data" in text_section:
+                    pd.testing.assert_frame_equal(text_section["data"], mmapped_section["data"])
+
+    def test_mmap_engine_utf8(self, tmp_path):
+        path = str(tmp_path / "utf8.sgf")
+        with open(path, "wb") as f:
+            f.write("$\nHK=1,HQ=Åsen\xa0\n#\nD=1,A=2\u2028D=2\nD=3\x85A=4\n$\xa0\nHK=2,HQ=Bjørn\u3000\n".encode("utf-8"))
+        for encoding in (None, "utf-8"):
+            text = sgf.parse(path, encoding=encoding)
+            mmapped = sgf.parse(path, encoding=encoding, engine="mmap")
+            assert len(text) == len(mmapped) == 2
+            assert repr(text) == repr(mmapped)
+        assert text[0]["main"][0]["signature"] == "Åsen"
+        assert len(text[0]["data"]) == 4
+
+    def test_compact_dtypes(self, tmp_path):
+        for name in os.listdir(basepath):
+            path = os.path.join(basepath, name)
+            orig = sgf.SGFData(path)
+            compact = sgf.SGFData(path, dtype_policy="compact")
+            compact.main[compact.id_col] = orig.main[orig.id_col]
+            compact.data[compact.id_col] = orig.data[orig.id_col]
+            assert compact.data.memory_usage(deep=True).sum() <= orig.data.memory_usage(deep=True).sum()
+            assert compact.dtype_report is not None
+            orig.dump(str(tmp_path / "orig.sgf"))
+            compact.dump(str(tmp_path / "compact.sgf"))
+            with open(str(tmp_path / "orig.sgf"), "rb") as f, open(str(tmp_path / "compact.sgf"), "rb") as g:
+                assert f.read() == g.read(), name
+
+    def test_scan_headers(self, tmp_path):
+        names = sorted(name for name in os.listdir(basepath) if name != "two_lines_header.cpt")
+        path = str(tmp_path / "multi.sgf")
+        with open(path, "wb") as f:
+            for name in names:
+                with open(os.path.join(basepath, name), "rb") as g:
+                    f.write(g.read().rstrip(b"\r\n,") + b"\n")
+        full = sgf.parse(path)
+        for engine in ("mmap", "text"):
+            headers = sgf.scan_headers(path, engine=engine)
+            assert len(headers) == len(full)
+            for full_section, header_section in zip(full, headers):
+                assert "data" not in header_section
+                assert repr(full_section["main"]) == repr(header_section["main"])
+                if engine == "mmap":
+                    pd.testing.assert_frame_equal(sgf.load_data(path, header_section), full_section["data"])
+                else:
+                    with pytest.raises(ValueError):
+                        sgf.load_data(path, header_section)
+        with pytest.raises(ValueError):
+            sgf.parse(path, blocks=("header",))
+
+    def test_dump_scan_headers(self):
+        path = os.path.join(basepath, "1059.cpt")
+        headers = sgf.scan_headers(path)
+        assert all("data_offsets" in section for section in headers)
+        full = sgf.parse(path)
+        for section in full:
+            del section["data"]
+        assert sgf.dumps(headers) == sgf.dumps(full)
+        reread = sgf.parse(io.BytesIO(sgf.dumps(headers)), encoding="latin-1")
+        assert len(reread) == len(headers)
+        assert all("data" not in section for section in reread)
+
+    def test_sgfdata_blocks(self):
+        path = os.path.join(basepath, "1059.cpt")
+        catalog = sgf.SGFData(path, blocks=("main",), engine="mmap")
+        assert len(catalog.data) == 0
+        pd.testing.assert_frame_equal(catalog.main, sgf.SGFData(path).main.assign(investigation_point=catalog.main.investigation_point))
+
+    def test_sgfdata_dump(self):
+        data = sgf.SGFData(*[sgf.SGFData(os.path.join(basepath, name)) for name in sorted(os.listdir(basepath))])
+        for d in (data, data.normalize()):
+            direct = io.BytesIO()
+            d.dump(direct)
+            via_sections = io.BytesIO()
+            sgf.dump(d.sections, via_sections)
+            assert direct.getvalue() == via_sections.getvalue()
+
+    def test_duplicate_key_with_missing_column(self):
+        for engine in ("text", "mmap"):
+            res = sgf.parse(io.BytesIO(b"$\nHK=1\n#\nD=1,A=2\nD=2,D=3\nD=4,A=5\n"), encoding="latin-1", engine=engine)
+            data = res[0]["data"]
+            assert list(data.depth) == [1, 3, 4]
+            assert data.feed_thrust_force.isna().tolist() == [False, True, False]
+            assert list(data.feed_thrust_force.dropna()) == [2.0, 5.0]
@@ -0,0 +1,32 @@
+import os.path
+import shutil
+
+import libsgfdata as sgf
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "examples", "data")
+
+class TestParseMany:
+    def test_parse_many(self, tmp_path):
+        paths = [os.path.join(basepath, name) for name in sorted(os.listdir(basepath))]
+        broken = str(tmp_path / "broken.sgf")
+        with open(broken, "w") as f:
+            f.write("#\nD=1\n")
+
+        serial = sgf.SGFData(*[sgf.SGFData(path) for path in paths])
+        for workers in (1, 2):
+            res = sgf.SGFData.from_files(paths + [broken], workers=workers)
+            assert list(res.parse_errors.keys()) == [broken]
+            assert len(res.main) == len(serial.main)
+            assert len(res.data) == len(serial.data)
+            assert list(res.data.columns) == list(serial.data.columns)
+
+    def test_collision(self, tmp_path):
+        path = os.path.join(basepath, "31.STD")
+        copy = str(tmp_path / "copy.STD")
+        shutil.copy(path, copy)
+        for workers in (1, 2):
+            res = sgf.parse_many([path, copy], workers=workers)
+            assert list(res.parse_errors.keys()) == [copy]
+            assert isinstance(res.parse_errors[copy], ValueError)
+            assert len(res.main) == 1
+            assert len(res.data) == len(sgf.SGFData(path).data)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import libsgfdata
+
+def make(id, depths, extra=None):
+    data = pd.DataFrame({"depth": depths, "investigation_point": id})
+    if extra:
+        data[extra] = 1.0
+    return libsgfdata.SGFData({
+        "main": pd.DataFrame({"investigation_point": [id], "method_code": [7]}),
+        "data": data,
+        "method": pd.DataFrame({"investigation_point": [id], "method_code": [7]})})
+
+class TestSGFDataBuilder:
+    def test_finalize(self):
+        builder = libsgfdata.SGFDataBuilder()
+        builder.append(make("a", [1.0, 2.0]))
+        builder.extend([make("b", [3.0], extra="feed_thrust_force"), make("c", [])])
+        assert len(builder) == 3
+        res = builder.finalize()
+        assert list(res.main.investigation_point) == ["a", "b", "c"]
+        assert list(res.main.index) == [0, 1, 2]
+        assert list(res.data.depth) == [1.0, 2.0, 3.0]
+        assert list(res.data.columns) == ["depth", "investigation_point", "feed_thrust_force"]
+        assert res.data.feed_thrust_force.isna().tolist() == [True, True, False]
+        assert list(res.data.index) == [0, 1, 2]
+
+    def test_collision(self):
+        builder = libsgfdata.SGFDataBuilder()
+        builder.append(make("a", [1.0]))
+        with pytest.raises(ValueError):
+            builder.append(make("a", [2.0]))
+        assert len(builder) == 1
+        assert list(builder.finalize().data.depth) == [1.0]
+
+    def test_parse_errors(self):
+        sgf = make("a", [1.0])
+        sgf.parse_errors = {"x.sgf": Exception("broken")}
+        assert list(libsgfdata.SGFDataBuilder().append(sgf).finalize().parse_errors) == ["x.sgf"]
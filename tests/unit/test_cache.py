@@ -0,0 +1,75 @@
+import os.path
+import pandas as pd
+import pytest
+
+import libsgfdata
+from libsgfdata import cache
+
+pytest.importorskip("pyarrow")
+
+basepath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "examples", "data")
+
+class TestParseCache:
+    def test_warm_load(self, tmp_path, monkeypatch):
+        path = os.path.join(basepath, "1059.cpt")
+        cold = libsgfdata.SGFData(path, cache_dir=str(tmp_path))
+        entries = os.listdir(str(tmp_path))
+        assert len(entries) == 1
+        assert sorted(os.listdir(str(tmp_path / entries[0]))) == ["data.parquet", "main.parquet", "method.parquet"]
+        def fail(*arg, **kw):
+            raise AssertionError("parsed despite a cache entry")
+        monkeypatch.setattr(libsgfdata, "iter_sections", fail)
+        warm = libsgfdata.SGFData(path, cache_dir=str(tmp_path))
+        for block in ("main", "data", "method"):
+            pd.testing.assert_frame_equal(getattr(cold, block), getattr(warm, block))
+
+    def test_options_and_content_are_part_of_key(self, tmp_path):
+        parse_cache = cache.ParseCache(str(tmp_path))
+        path = str(tmp_path / "a.sgf")
+        with open(path, "wb") as f:
+            f.write(b"$\nHK=1\n")
+        key = parse_cache.key(path)
+        assert parse_cache.key(path, blocks=("main",)) != key
+        with open(path, "wb") as f:
+            f.write(b"$\nHK=2\n")
+        assert parse_cache.key(path) != key
+
+    def test_invalidate_and_clear(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        parse_cache = cache.ParseCache(cache_dir)
+        for name in ("1059.cpt", "31.STD"):
+            libsgfdata.SGFData(os.path.join(basepath, name), cache_dir=parse_cache)
+        libsgfdata.SGFData(os.path.join(basepath, "31.STD"), cache_dir=parse_cache, blocks=("main",))
+        assert len(os.listdir(cache_dir)) == 3
+        parse_cache.invalidate(os.path.join(basepath, "31.STD"))
+        assert len(os.listdir(cache_dir)) == 1
+        parse_cache.clear()
+        assert os.listdir(cache_dir) == []
+
+    def test_eviction(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        parse_cache = cache.ParseCache(cache_dir, max_size=None)
+        paths = [os.path.join(basepath, name) for name in ("1059.cpt", "31.STD", "1-CPT.std")]
+        for path in paths:
+            libsgfdata.SGFData(path, cache_dir=parse_cache)
+        # Make the first file the least recently used one
+        for idx, path in enumerate(paths):
+            for name in os.listdir(cache_dir):
+                if name.startswith(cache.file_hash(path)):
+                    os.utime(os.path.join(cache_dir, name), (idx, idx))
+        parse_cache.max_size = parse_cache.size() - 1
+        parse_cache.evict()
+        remaining = os.listdir(cache_dir)
+        assert len(remaining) == 2
+        assert not any(name.startswith(cache.file_hash(paths[0])) for name in remaining)
+
+    def test_running_size(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        parse_cache = cache.ParseCache(cache_dir)
+        for name in ("1059.cpt", "31.STD"):
+            libsgfdata.SGFData(os.path.join(basepath, name), cache_dir=parse_cache)
+        size = parse_cache._size
+        assert size == parse_cache.size() > 0
+        assert cache.ParseCache(cache_dir)._size == size
+        parse_cache.invalidate(os.path.join(basepath, "31.STD"))
+        assert parse_cache._size == parse_cache.size() < size
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+import libsgfdata
+from libsgfdata import metadata
+
+
+class TestCategorical:
+
+    def test_categorical(self):
+        res = metadata.categorical([-1, 95, 1234, -1, "x"], metadata.comments_categories, metadata.comments_idents)
+        assert list(res) == ["no_comment", "soil_rock_sounding_interrupted", 1234, "no_comment", "x"]
+        assert list(res.categories[:len(metadata.comments_categories)]) == metadata.comments_categories
+        assert list(res.categories[len(metadata.comments_categories):]) == [1234, "x"]
+
+    def test_uncategorical(self):
+        values = metadata.categorical([-1, 95, 1234, np.nan], metadata.comments_categories, metadata.comments_idents)
+        res = metadata.uncategorical(values, metadata.comments_codes)
+        assert list(res[:3]) == [-1, 95, 1234]
+        assert pd.isnull(res[3])
+
+    def test_concat_keeps_categories(self):
+        a = pd.DataFrame({"comments": metadata.categorical([1234], metadata.comments_categories)})
+        b = pd.DataFrame({"comments": metadata.categorical(["x"], metadata.comments_categories)})
+        c = pd.DataFrame({"depth": [1.0]})
+        res = libsgfdata._concat([a, b, c], ignore_index=True)
+        assert isinstance(res.comments.dtype, pd.CategoricalDtype)
+        assert list(res.comments.iloc[:2]) == [1234, "x"]
@@ -0,0 +1,41 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from libsgfdata.parser import _ColumnarBlock
+
+
+class TestColumnarBlock:
+
+    @pytest.mark.parametrize('rows', [
+        [{'D': 0.025, 'A': 1.65}, {'D': 0.05, 'A': 1.938}],
+        [{'D': 0.025, 'R': 25}, {'D': 0.05}, {'D': 0.075, 'R': 24}],
+        [{'R': 25}, {'R': 23}],
+        [{'R': 25}, {'R': 2.5}, {'R': 'x'}],
+        [{'D': 1.0}, {'D': 2}, {'D': 'x'}],
+        [{'D': 1.0}, {}, {'K': 'comment'}],
+        [{'AK': datetime.datetime(2002, 8, 22, 11, 32)}, {'D': 1.0}],
+        [{'R': 2 ** 70}, {'R': 1}],
+    ])
+    def test_identical_to_list_of_dicts(self, rows):
+        block = _ColumnarBlock()
+        for row in rows:
+            block.append(row.items())
+        pd.testing.assert_frame_equal(block.to_frame(), pd.DataFrame(rows))
+
+    def test_duplicate_key_last_wins(self):
+        block = _ColumnarBlock()
+        block.append([('D', 1.0), ('D', 2.0)])
+        block.append([('D', 3.0)])
+        assert len(block) == 2
+        assert block.to_frame().D.tolist() == [2.0, 3.0]
+
+    def test_duplicate_key_with_missing_column(self):
+        block = _ColumnarBlock()
+        block.append([('D', 1.0), ('A', 2.0)])
+        block.append([('D', 2.0), ('D', 3.0)])
+        block.append([('D', 4.0), ('A', 5.0)])
+        frame = block.to_frame()
+        assert frame.D.tolist() == [1.0, 3.0, 4.0]
+        assert frame.A.isna().tolist() == [False, True, False]
@@ -0,0 +1,56 @@
+import os
+import pandas as pd
+import pytest
+
+import libsgfdata
+
+pytest.importorskip("pyarrow")
+
+def make(ids, rows=3):
+    return libsgfdata.SGFData({
+        "main": pd.DataFrame({"investigation_point": ids,
+                              "method_code": [7 if idx % 2 else 8 for idx in range(len(ids))],
+                              "x_coordinate": [float(idx) for idx in range(len(ids))],
+                              "y_coordinate": [0.0] * len(ids)}),
+        "data": pd.DataFrame({"investigation_point": [id for id in ids for row in range(rows)],
+                              "depth": [float(row) for id in ids for row in range(rows)]}),
+        "method": pd.DataFrame({"investigation_point": ids, "method_code": [7] * len(ids)})})
+
+class TestSGFDataset:
+    def test_writer(self, tmp_path):
+        path = str(tmp_path / "ds")
+        with libsgfdata.SGFDatasetWriter(path, shard_rows=5) as writer:
+            writer.append(make(["a", "b"]))
+            writer.append(make(["c"]))
+            writer.append(make(["d", "e"]))
+        ds = libsgfdata.SGFDataset(path)
+        assert len(ds) == 5
+        assert list(ds.shards.rows) == [6, 9]
+        assert list(ds.shards.maxx) == [1.0, 1.0]
+        assert ds.shards.file.str.endswith(".parquet").all()
+        sgf = ds.select(ids=["c", "a"])
+        assert list(sgf.main.investigation_point) == ["a", "c"]
+        assert list(sgf.data.investigation_point) == ["a"] * 3 + ["c"] * 3
+        assert list(sgf.method.investigation_point) == ["a", "c"]
+        assert len(ds.borehole("e").data) == 3
+
+    def test_collision(self, tmp_path):
+        writer = libsgfdata.SGFDatasetWriter(str(tmp_path / "ds"))
+        writer.append(make(["a", "b"]))
+        with pytest.raises(ValueError):
+            writer.append(make(["b"]))
+
+    def test_to_dataset(self, tmp_path):
+        path = str(tmp_path / "ds")
+        sgf = make(["a", "b", "c", "d", "e"], rows=4)
+        sgf.to_dataset(path, shard_rows=8)
+        ds = libsgfdata.SGFDataset.open(path)
+        assert list(ds.shards.rows) == [8, 8, 4]
+        assert len([name for name in os.listdir(path) if name.startswith("data-")]) == 3
+        assert list(ds.within_bbox(1.5, -1, 3.5, 1).main.investigation_point) == ["c", "d"]
+        assert list(ds.select(method_code=7).main.investigation_point) == ["b", "d"]
+        assert list(ds.select(bbox=(0, -1, 2, 1), method_code=[8]).data.investigation_point.unique()) == ["a", "c"]
+        shards = list(ds.iter_shards())
+        assert [list(shard.main.investigation_point) for shard in shards] == [["a", "b"], ["c", "d"], ["e"]]
+        assert pd.concat([shard.data for shard in shards], ignore_index=True).equals(sgf.data)
+        assert list(ds.select(ids=["b"], columns=["depth"]).data.columns) == ["investigation_point", "depth"]
@@ -1,13 +1,17 @@
 import datetime
 
+import numpy as np
 import pytest
 
 from libsgfdata.parser import _conv
+from libsgfdata.metadata import _conv_date, _conv_datetime, _conv_time, _conv_date_column, _conv_datetime_column, _conv_time_column
 
 class TestDates:
 
     @pytest.mark.parametrize("block, key, date_string, expected_result", [
         ("data", "AK", "200208221132", datetime.datetime(2002, 8, 22, 11, 32)),
+        ("data", "DatumTid", "20220105150051721", datetime.datetime(2022, 1, 5, 15, 0, 51, 721000)),
+        ("data", "AK", "20120105", datetime.datetime(2012, 1, 5)),
         ("main", "HD", "20120105", datetime.date(2012, 1, 5)),
         ("main", "HD", "09/04/99", datetime.date(1999, 4, 9)),
         ("main", "HD", "27.06.2014", datetime.date(2014, 6, 27)),
@@ -15,3 +19,20 @@ class TestDates:
     ])
     def test_dates(self, block, key, date_string, expected_result):
         assert expected_result == _conv(block, key, date_string)
+
+    @pytest.mark.parametrize("conv, colconv, values", [
+        (_conv_datetime, _conv_datetime_column, ["20220105150051721", np.nan, "20220105150052000", "", "2022010515005", "x", "20221305150051721"]),
+        (_conv_datetime, _conv_datetime_column, ["200208221132", "27.06.2014"]),
+        (_conv_date, _conv_date_column, ["09/04/99", "09/04/70", np.nan, "31/02/99"]),
+        (_conv_date, _conv_date_column, ["27.06.2014", "1.2.2020", "20120105"]),
+        (_conv_date, _conv_date_column, ["garbage", "20120105"]),
+        (_conv_time, _conv_time_column, ["1130", np.nan, "113015", "1130", ""]),
+    ])
+    def test_column_same_as_values(self, conv, colconv, values):
+        expected = [v if not isinstance(v, str) else conv(v) for v in values]
+        assert [repr(v) for v in colconv(values)] == [repr(v) for v in expected]
+
+    def test_datetime_column_vectorized(self):
+        res = _conv_datetime_column(["20220105150051721", np.nan, "20220105150052000"])
+        assert res.dtype == np.dtype("datetime64[us]")
+        assert np.isnat(res[1])
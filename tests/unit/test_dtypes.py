@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from libsgfdata import dtypes
+
+class TestCompact:
+    def test_compact(self):
+        data = pd.DataFrame({
+            "depth": [0.1, 0.2, 10.525],
+            "feed_thrust_force": [1.0, np.nan, 3.3],
+            "ramming_flag": [0, 1, 1],
+            "investigation_point": ["a", "a", "b"]})
+        res, report = dtypes.compact(data)
+        assert res.depth.dtype == np.float32
+        assert res.feed_thrust_force.dtype == np.float32
+        assert res.ramming_flag.dtype == np.int8
+        assert isinstance(res.investigation_point.dtype, pd.CategoricalDtype)
+        assert set(report.index) == set(data.columns)
+        assert (report.saved > 0).all()
+        assert list(dtypes.expand(res).depth) == [0.1, 0.2, 10.525]
+
+    def test_lossy_values_are_kept(self):
+        data = pd.DataFrame({"depth": [0.123456789], "time_of_measurement": [2**40]})
+        res, report = dtypes.compact(data)
+        assert res.depth.dtype == np.float64
+        assert res.time_of_measurement.dtype == np.int64
+        assert len(report) == 0
+
+    def test_unknown_columns_are_kept(self):
+        data = pd.DataFrame({"PR": [0.5]})
+        res, report = dtypes.compact(data)
+        assert res.PR.dtype == np.float64
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            dtypes.apply_policy(pd.DataFrame(), "tiny")
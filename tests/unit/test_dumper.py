@@ -0,0 +1,63 @@
+import datetime
+import io
+import numpy as np
+import pandas as pd
+
+import libsgfdata
+from libsgfdata.dumper import _dump_line, _dump_frame, _iter_model_dict
+
+class TestDumpFrame:
+    def test_same_as_dump_line(self):
+        frame = pd.DataFrame({
+            "D": [0.1, 1.0, np.nan, 1e-05],
+            "K": pd.Categorical(["x", None, "x", 7]),
+            "J": [1, 2, 3, 4],
+            "T": ["a", "", None, "b"],
+            "HD": [datetime.date(2020, 1, 2), np.nan, np.nan, datetime.date(2021, 3, 4)]})
+        expected = "".join(_dump_line("data", row) + "\n" for row in frame.to_dict("records"))
+        assert _dump_frame("data", frame) == expected
+
+    def test_nullable(self):
+        frame = pd.DataFrame({
+            "D": pd.array([2.0, pd.NA, 3.5], dtype="Float64"),
+            "A": pd.array([pd.NA, 1, 2], dtype="Int64"),
+            "x": pd.array([pd.NA, True, False], dtype="boolean")})
+        assert _dump_frame("data", frame) == "D=2.0\nA=1,x=True\nD=3.5,A=2,x=False\n"
+        sgf = libsgfdata.SGFData({
+            "main": pd.DataFrame({"investigation_point": ["a"]}),
+            "data": pd.DataFrame({"investigation_point": ["a"] * 3,
+                                  "depth": frame.D,
+                                  "feed_thrust_force": frame.A})})
+        data = libsgfdata.parse(io.BytesIO(sgf.dumps()), encoding="latin-1")[0]["data"]
+        assert data.depth.isna().tolist() == [False, True, False]
+        assert data.feed_thrust_force.isna().tolist() == [True, False, False]
+        assert list(data.feed_thrust_force.iloc[1:]) == [1, 2]
+
+    def test_empty(self):
+        assert _dump_frame("data", pd.DataFrame({"D": []})) == ""
+        assert _dump_frame("data", pd.DataFrame({"D": [np.nan]})) == "\n"
+
+class TestIterDump:
+    def make(self):
+        ids = [str(idx) for idx in range(20)]
+        return libsgfdata.SGFData({
+            "main": pd.DataFrame({"investigation_point": ids, "method_code": [7] * 20}),
+            "data": pd.DataFrame({"investigation_point": [id for id in ids for row in range(30)],
+                                  "depth": [row * 0.1 for id in ids for row in range(30)]}),
+            "method": pd.DataFrame({"investigation_point": ids, "method_code": [7] * 20})})
+
+    def test_chunks(self):
+        sgf = self.make()
+        expected = libsgfdata.dumps(sgf.sections)
+        chunks = list(libsgfdata.iter_dump(iter(sgf.sections), chunk_size=1000))
+        assert len(chunks) > 1
+        assert all(chunk.startswith(b"$\n") for chunk in chunks)
+        assert all(len(chunk) >= 1000 for chunk in chunks[:-1])
+        assert b"".join(chunks) == expected
+        assert b"".join(sgf.iter_dump(chunk_size=1000)) == expected
+        assert sgf.dumps() == expected
+
+    def test_batches(self):
+        sgf = self.make()
+        expected = "".join(_iter_model_dict(sgf.model_dict))
+        assert "".join(_iter_model_dict(sgf.model_dict, batch_rows=50)) == expected
@@ -0,0 +1,35 @@
+from libsgfdata.parser import EncodingDetector
+
+
+class TestEncodingDetector:
+
+    def test_ascii(self):
+        detector = EncodingDetector()
+        assert detector.detect(b"$\nHA=1,HK=31\n") == "ascii"
+        assert detector.stats == {"ascii": 1}
+
+    def test_utf8_truncated_sample(self):
+        detector = EncodingDetector()
+        sample = "$\nHA=1,HQ=Bjørn Åsen\n".encode("utf-8")
+        assert detector.detect(sample[:-3]) == "utf-8"
+        assert detector.stats == {"utf-8": 1}
+
+    def test_cached(self):
+        detector = EncodingDetector()
+        sample = "$\nHA=1,HQ=Bjørn Åsen,HR=0°0'0.000\"E\n".encode("latin-1")
+        encoding = detector.detect(sample)
+        assert detector.detect(sample.replace(b"HA=1", b"HA=2")) == encoding
+        assert detector.stats == {"detected": 1, "cached": 1}
+
+    def test_per_batch(self):
+        detector = EncodingDetector(per_batch=True)
+        encoding = detector.detect("$\nHQ=Bjørn Åsen\n".encode("latin-1"))
+        assert detector.detect("$\nHR=0°0'0.000\"E\n".encode("latin-1")) == encoding
+        assert detector.stats == {"detected": 1, "batch": 1}
+
+    def test_cache_size(self):
+        detector = EncodingDetector(cache_size=2)
+        for value in ("Bjørn", "Åsen", "0°0'0.000\"E"):
+            detector.detect(("$\nHQ=%s\n" % value).encode("latin-1"))
+        assert len(detector.cache) == 2
+        assert bytes(sorted(set("ø".encode("latin-1")))) not in detector.cache
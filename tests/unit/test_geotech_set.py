@@ -0,0 +1,132 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+import libsgfdata
+
+class TestSectionsToGeotechSet:
+    def test_columns(self):
+        sections = [
+            {"main": [{"investigation_point": "a", "x_coordinate": 1.0}],
+             "data": pd.DataFrame({"depth": [0.1, 0.2]}),
+             "method": [{"method_code": 1}, {"method_code": 2}]},
+            {"main": [{"investigation_point": "b", "x_coordinate": 2.0}]},
+            {"main": [{"investigation_point": "c", "y_coordinate": 3.0}],
+             "data": [{"depth": 0.5, "comments": "x"}]}]
+        res = libsgfdata.sections_to_geotech_set(sections)
+        assert list(res["main"].investigation_point) == ["a", "b", "c"]
+        assert list(res["data"].columns) == ["depth", "investigation_point", "comments"]
+        assert list(res["data"].investigation_point) == ["a", "a", "c"]
+        assert list(res["data"].depth) == [0.1, 0.2, 0.5]
+        assert list(res["method"].investigation_point) == ["a", "a"]
+        assert list(res["method"].method_code) == [1, 2]
+
+    def test_generated_ids(self, capsys):
+        res = libsgfdata.sections_to_geotech_set(iter([{}, {"data": [{"depth": 1.0}]}]))
+        assert len(res["main"]) == 2
+        assert res["main"].investigation_point.is_unique
+        assert res["data"].investigation_point[0] == res["main"].investigation_point[1]
+        assert capsys.readouterr().out == ""
+
+    def test_merge(self):
+        res = libsgfdata.sections_to_geotech_set(
+            [{"main": [{"investigation_point": "a", "x_coordinate": 1.0}, {"y_coordinate": 2.0}]}], merge=True)
+        assert len(res["main"]) == 1
+        assert res["main"].y_coordinate[0] == 2.0
+
+class TestGeotechSetToSections:
+    def test_unsorted(self):
+        geotech = {"main": pd.DataFrame({"investigation_point": ["a", "b"], "x_coordinate": [1.0, 2.0]}),
+                   "data": pd.DataFrame({"investigation_point": ["b", "a", "b"], "depth": [1.0, 2.0, 3.0]}),
+                   "method": pd.DataFrame({"investigation_point": ["b"], "method_code": [1]})}
+        sections = libsgfdata.geotech_set_to_sections(geotech)
+        assert [section["main"][0]["x_coordinate"] for section in sections] == [1.0, 2.0]
+        assert list(sections[0]["data"].depth) == [2.0]
+        assert list(sections[1]["data"].depth) == [1.0, 3.0]
+        assert list(sections[1]["data"].index) == [0, 2]
+        assert sections[0]["method"] == []
+        assert sections[1]["method"] == [{"investigation_point": "b", "method_code": 1}]
+
+class TestSectionsCache:
+    def make(self):
+        return libsgfdata.SGFData({
+            "main": pd.DataFrame({"investigation_point": ["a", "b"], "x_coordinate": [1.0, 2.0]}),
+            "data": pd.DataFrame({"investigation_point": ["a", "b", "b"], "depth": [1.0, 2.0, 3.0]}),
+            "method": pd.DataFrame({"investigation_point": ["b"], "method_code": [1]})})
+
+    def test_cached(self):
+        sgf = self.make()
+        assert sgf.get_sections(view=True) is sgf.get_sections(view=True)
+        assert sgf.sections is not sgf.get_sections(view=True)
+        assert sgf.sections[0]["data"].equals(sgf.get_sections(view=True)[0]["data"])
+
+    def test_copy(self):
+        sgf = self.make()
+        for sections in (sgf.get_sections(), sgf.sections):
+            sections[0]["main"][0]["x_coordinate"] = 10.0
+            sections[1]["data"].loc[1, "depth"] = -1.0
+            sections[1]["data"]["depth"] = 0.0
+            assert sgf.sections[0]["main"][0]["x_coordinate"] == 1.0
+            assert list(sgf.sections[1]["data"].depth) == [2.0, 3.0]
+
+    def test_invalidation(self):
+        sgf = self.make()
+        sections = sgf.get_sections(view=True)
+        sgf.data = sgf.data.assign(depth=[5.0, 6.0, 7.0])
+        assert sgf.get_sections(view=True) is not sections
+        assert list(sgf.sections[0]["data"].depth) == [5.0]
+        sections = sgf.get_sections(view=True)
+        sgf.main["z_coordinate"] = 3.0
+        assert sgf.get_sections(view=True) is not sections
+        sections = sgf.get_sections(view=True)
+        assert sgf.get_sections(view=True) is sections
+        sgf.main.loc[0, "x_coordinate"] = 4.0
+        assert sgf.sections[0]["main"][0]["x_coordinate"] == 4.0
+        sgf.data.loc[2, "depth"] = 8.0
+        assert list(sgf.sections[1]["data"].depth) == [6.0, 8.0]
+
+    def test_scoped_to_blocks(self):
+        sgf = self.make()
+        sgf.main["projection"] = 3006
+        assert sgf.projection == 3006
+        cached = sgf._cache["projection"]
+        depth = sgf.data.depth.to_numpy()
+        sgf.data.loc[0, "depth"] = 5.0
+        assert sgf.projection == 3006
+        assert sgf._cache["projection"] is cached
+        assert np.shares_memory(sgf.data.depth.to_numpy(), depth)
+
+class TestBoreholeIndex:
+    def make(self):
+        return libsgfdata.SGFData({
+            "main": pd.DataFrame({"investigation_point": ["a", "b", "c"], "x_coordinate": [1.0, 2.0, 3.0]}),
+            "data": pd.DataFrame({"investigation_point": ["b", "a", "b", "c"], "depth": [1.0, 2.0, 3.0, 4.0]}),
+            "method": pd.DataFrame({"investigation_point": ["b"], "method_code": [1]})})
+
+    def test_borehole(self):
+        sgf = self.make()
+        b = sgf.borehole("b")
+        assert list(b.main.x_coordinate) == [2.0]
+        assert list(b.data.depth) == [1.0, 3.0]
+        assert list(b.method.method_code) == [1]
+        assert len(sgf.borehole("a").method) == 0
+        with pytest.raises(KeyError):
+            sgf.borehole("x")
+
+    def test_boreholes(self):
+        sgf = self.make()
+        res = sgf.boreholes(["c", "b"])
+        assert list(res.main.investigation_point) == ["c", "b"]
+        assert list(res.data.depth) == [4.0, 1.0, 3.0]
+
+    def test_iter_boreholes(self):
+        sgf = self.make()
+        assert [(id, list(b.data.depth)) for id, b in sgf.iter_boreholes()] == [
+            ("a", [2.0]), ("b", [1.0, 3.0]), ("c", [4.0])]
+
+    def test_rebuilt_after_change(self):
+        sgf = self.make()
+        assert list(sgf.borehole("a").data.depth) == [2.0]
+        sgf.data = pd.DataFrame({"investigation_point": ["a", "a"], "depth": [5.0, 6.0]})
+        assert list(sgf.borehole("a").data.depth) == [5.0, 6.0]
+        assert len(sgf.borehole("b").data) == 0
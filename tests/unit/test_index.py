@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from libsgfdata import index
+
+class TestGroupIndex:
+    def test_contiguous(self):
+        groups = index.GroupIndex(pd.Series(["b", "b", "a", "c", "c", "c"]))
+        assert groups.keys == ["b", "a", "c"]
+        assert groups.order is None
+        assert groups.slice("a") == slice(2, 3)
+        assert groups.slice("c") == slice(3, 6)
+        assert groups.slice("x") == slice(0, 0)
+
+    def test_unsorted(self):
+        frame = pd.DataFrame({"id": ["b", "a", "b", np.nan, "a"], "value": range(5)})
+        groups = index.GroupIndex(frame.id)
+        assert groups.keys == ["b", "a"]
+        assert "a" in groups and "x" not in groups
+        grouped = groups.sort(frame)
+        assert list(grouped.value.iloc[groups.slice("b")]) == [0, 2]
+        assert list(grouped.value.iloc[groups.slice("a")]) == [1, 4]
+
+    def test_rows(self):
+        groups = index.GroupIndex(pd.Series(["a", "b", "a", "c"]))
+        assert list(groups.rows(["c", "a"])) == [3, 0, 1]
+        assert list(groups.rows([])) == []
@@ -2,7 +2,8 @@ from datetime import time
 
 import pytest
 
-from libsgfdata.parser import _parse_line
+from libsgfdata import metadata
+from libsgfdata.parser import _parse_line, _conv, _conv_untyped, _conversion_plans
 
 
 class TestParseLine:
@@ -23,3 +24,22 @@ class TestParseLine:
             assert type(parsed_line['J']) == float
         elif test_case == 'DATE_FIELD':
             assert type(parsed_line['HI']) == time
+
+
+class TestConversionPlan:
+
+    @pytest.mark.parametrize('value', [
+        '1', '-1', ' +1 ', '1.', '.5', '1.5', '1e5', '+.5E-3', '00012',
+        'e5', '1e', '1.2.3', 'nan', 'inf', '1_0', '1 2', '', ' ', 'ud450A', '-', '.',
+    ])
+    def test_untyped_same_as_conv(self, value):
+        expected = _conv('data', 'D', value)
+        result = _conv_untyped(value)
+        assert type(result) == type(expected)
+        assert result == expected
+
+    @pytest.mark.parametrize('block, key', [
+        ('main', 'HD'), ('main', 'HI'), ('data', 'AK'), ('data', 'DatumTid'),
+    ])
+    def test_plan_uses_metadata_converter(self, block, key):
+        assert _conversion_plans[block][key] is metadata.block_metadata[block].conv[key]
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import pandas as pd
+
+import libsgfdata
+from libsgfdata import spatial
+
+class TestKDTree:
+    def setup_method(self):
+        rnd = np.random.default_rng(0)
+        self.x = rnd.uniform(0, 1000, 2000)
+        self.y = rnd.uniform(0, 1000, 2000)
+        self.x[5] = np.nan
+        self.tree = spatial.KDTree(self.x, self.y, leafsize=8)
+
+    def test_within_bbox(self):
+        expected = np.flatnonzero((self.x >= 100) & (self.x <= 300) & (self.y >= 250) & (self.y <= 700))
+        assert list(self.tree.within_bbox(100, 250, 300, 700)) == list(expected)
+        assert len(self.tree.within_bbox(2000, 2000, 3000, 3000)) == 0
+
+    def test_within_radius(self):
+        dist = np.hypot(self.x - 500, self.y - 400)
+        assert list(self.tree.within_radius(500, 400, 120)) == list(np.flatnonzero(dist <= 120))
+
+    def test_nearest(self):
+        dist = np.hypot(self.x - 321, self.y - 654)
+        dist[np.isnan(dist)] = np.inf
+        distances, positions = self.tree.nearest(321, 654, 10)
+        assert list(positions) == list(np.argsort(dist)[:10])
+        assert np.allclose(distances, np.sort(dist)[:10])
+        assert len(self.tree.nearest(0, 0, 5000)[1]) == 1999
+
+    def test_empty(self):
+        tree = spatial.KDTree([], [])
+        assert len(tree.within_bbox(0, 0, 1, 1)) == 0
+        assert len(tree.nearest(0, 0, 3)[1]) == 0
+
+class TestSGFDataSpatial:
+    def test_queries(self):
+        sgf = libsgfdata.SGFData({
+            "main": pd.DataFrame({"investigation_point": ["a", "b", "c"],
+                                  "x_coordinate": [0.0, 10.0, 20.0],
+                                  "y_coordinate": [0.0, 0.0, 5.0]}),
+            "data": pd.DataFrame({"investigation_point": ["a", "b", "c"], "depth": [1.0, 2.0, 3.0]})})
+        assert list(sgf.within_bbox(5, -1, 25, 10).main.investigation_point) == ["b", "c"]
+        assert list(sgf.within_radius(0, 0, 10).data.depth) == [1.0, 2.0]
+        assert list(sgf.nearest(19, 4, 2).main.investigation_point) == ["c", "b"]
+
+    def test_index_cached_until_coordinates_change(self):
+        sgf = libsgfdata.SGFData({
+            "main": pd.DataFrame({"investigation_point": ["a", "b"],
+                                  "x_coordinate": [0.0, 10.0],
+                                  "y_coordinate": [0.0, 0.0]})})
+        tree = sgf._spatial_index()
+        assert sgf._spatial_index() is tree
+        sgf.main.loc[1, "x_coordinate"] = 1.0
+        assert list(sgf.within_bbox(-1, -1, 2, 1).main.investigation_point) == ["a", "b"]
+
+class TestConvexHull:
+    def test_hull(self):
+        x = np.array([0.0, 2.0, 2.0, 0.0, 1.0, 1.0, np.nan, 1.0])
+        y = np.array([0.0, 0.0, 2.0, 2.0, 1.0, 0.0, 5.0, 2.0])
+        hull = spatial.convex_hull(x, y)
+        assert [tuple(point) for point in hull] == [(0, 0), (2, 0), (2, 2), (0, 2)]
+
+    def test_degenerate(self):
+        assert len(spatial.convex_hull([], [])) == 0
+        assert len(spatial.convex_hull([1.0, 1.0], [2.0, 2.0])) == 1
+        assert [tuple(point) for point in spatial.convex_hull([0.0, 1.0, 2.0], [0.0, 1.0, 2.0])] == [(0, 0), (2, 2)]
+
+class TestGeometryCache:
+    def make(self):
+        return libsgfdata.SGFData({
+            "main": pd.DataFrame({"investigation_point": ["a", "b", "c", "d"],
+                                  "x_coordinate": [0.0, 10.0, 10.0, 2.0],
+                                  "y_coordinate": [0.0, 0.0, 5.0, 1.0],
+                                  "projection": [3006] * 4})})
+
+    def test_geometry(self):
+        pytest.importorskip("geopandas")
+        sgf = self.make()
+        positions = sgf.positions
+        assert list(positions.geometry.x) == [0.0, 10.0, 10.0, 2.0]
+        assert positions.crs.to_epsg() == 3006
+        area = sgf.area
+        assert area.geometry[0].area == 25.0
+        assert list(sgf.bounds.iloc[0]) == [0.0, 0.0, 10.0, 5.0]
+        assert sgf.bounds.equals(area.bounds)
+
+    def test_cached_until_coordinates_change(self):
+        pytest.importorskip("geopandas")
+        sgf = self.make()
+        sgf.area
+        cached = sgf._cache["area"][1]
+        sgf.area
+        assert sgf._cache["area"][1] is cached
+        sgf.main.loc[2, "y_coordinate"] = 10.0
+        assert sgf.area.geometry[0].area == 50.0
+        assert list(sgf.bounds.iloc[0]) == [0.0, 0.0, 10.0, 10.0]
+        assert sgf.positions.geometry.y[2] == 10.0